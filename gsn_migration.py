@@ -1,25 +1,183 @@
 import os
+import sys
 import shutil
 import json
-import time
-from google import genai
+import hashlib
+import tempfile
+import threading
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Initialise the GSN Architect
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+import llm_client
+
+# Initialise the GSN Architect (quota, retries and the prompt cache live in llm_client)
 MODEL_ID = "gemini-3.5-flash"
-CACHE_FILE = "gsn_migration_state.log"
+client = llm_client.LLMClient(api_key=os.environ.get("GEMINI_API_KEY"), model=MODEL_ID)
+
+# Per-file state: {path: sha256 of the file as the migration left it}. A file
+# is skipped while its content still matches, so edits elsewhere never force a
+# rerun, and an interrupted pass resumes with only the files not yet recorded.
+STATE_FILE = "gsn_migration_state.json"
+LEGACY_STATE_LOG = "gsn_migration_state.log"
+MAX_WORKERS = 4   # throughput is set by the shared rate limit; workers just keep it busy
+# The hand-written files the restructure has to rewrite, as they sit after the
+# relocation step. Listed rather than walked: builder outputs (taiwan.html,
+# reports/, ...) are regenerated from templates every day, and modules added
+# since the restructure already use the new layout, so neither goes to the model.
+MIGRATION_SOURCES = [
+    '.github/workflows/daily_update.yml',
+    '.github/workflows/risk_check.yml',
+    'index.html',
+    'src/broadcast_matrix.py',
+    'src/build.py',
+    'src/build_ai.py',
+    'src/build_context.py',
+    'src/build_fiat.py',
+    'src/build_fuel.py',
+    'src/build_k_shape.py',
+    'src/build_macro.py',
+    'src/build_middle_east.py',
+    'src/build_orchestrator.py',
+    'src/build_sitemap.py',
+    'src/build_supply.py',
+    'src/build_whispers.py',
+    'src/export_tree.py',
+    'src/risk_check.py',
+    'src/screenshot.py',
+    'src/send_webhook.py',
+    'src/social_broadcast.py',
+    'src/test_api.py',
+    'templates/ai_template.html',
+    'templates/fiat_template.html',
+    'templates/fuel_template.html',
+    'templates/inequality_template.html',
+    'templates/macro_template.html',
+    'templates/middle_east_template.html',
+    'templates/report_template.html',
+    'templates/supply_template.html',
+    'templates/taiwan_template.html',
+    'templates/template.html',
+    'articles/ai-bubble-island.html',
+    'articles/beyond-tsmc-blockade.html',
+    'articles/decoding-diplomatic-speak.html',
+    'articles/dual-chokepoint.html',
+    'articles/grey-zone-tactics.html',
+    'articles/is-taiwan-safe-2026.html',
+    'articles/kinmen-frontline-explained.html',
+    'articles/macro-big-cycle.html',
+    'articles/median-line-explained.html',
+    'articles/quantitative-signal.html',
+    'articles/semiconductor-supply-chain.html',
+    'articles/signal-vs-noise.html',
+    'articles/silicon-shield.html',
+    'articles/supply-chain-article.html',
+    'articles/tracking-military-flights.html',
+    'articles/war-games-and-wall-street.html',
+    'articles/wealth-inequality-article.html',
+    'articles/what-is-an-adiz.html',
+]
+
+_STATE_LOCK = threading.Lock()
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def write_atomic(path, text):
+    folder = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    state = {}
+    if os.path.exists(LEGACY_STATE_LOG):
+        # The old log only listed paths: take each listed file as done in its current form
+        with open(LEGACY_STATE_LOG, 'r', encoding='utf-8') as f:
+            for line in f.read().splitlines():
+                path = os.path.normpath(line.strip().replace('\\', '/'))
+                try:
+                    with open(path, 'r', encoding='utf-8') as src:
+                        state[path] = content_hash(src.read())
+                except (OSError, UnicodeDecodeError):
+                    continue
+        save_state(state)
+        print(f"GSN TERMINAL: Imported {len(state)} completed files from {LEGACY_STATE_LOG}.")
+    return state
 
-def load_completed_files():
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, 'r') as f:
-            return set(f.read().splitlines())
-    return set()
+def save_state(state):
+    write_atomic(STATE_FILE, json.dumps(state, indent=1, sort_keys=True) + "\n")
 
-def mark_completed(filepath):
-    with open(CACHE_FILE, 'a') as f:
-        f.write(f"{filepath}\n")
+def mark_completed(state, filepath, text):
+    with _STATE_LOCK:
+        state[filepath] = content_hash(text)
+        save_state(state)
 
-def execute_migration():
+def collect_targets(state, redo=False):
+    """MIGRATION_SOURCES still to refactor, as {path: current content}, in list order.
+
+    A file edited by hand after it was refactored is left alone unless `redo`.
+    """
+    targets = {}
+    for file_path in map(os.path.normpath, MIGRATION_SOURCES):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                original_code = file.read()
+        except FileNotFoundError:
+            print(f"SKIPPED (Not Found): {file_path}")
+            continue
+
+        if state.get(file_path) == content_hash(original_code):
+            print(f"SKIPPED (Already Refactored): {file_path}")
+            continue
+        if file_path in state and not redo:
+            print(f"SKIPPED (Edited Since Refactor, use --redo): {file_path}")
+            continue
+        targets[file_path] = original_code
+    return targets
+
+def refactor_file(state, file_path, original_code):
+    prompt = f"""
+    You are the Lead Systems Architect for Global Shift Network.
+    The repository has been restructured. Python scripts are in /src. JSON data is in /data. CSS and Images are in /public. HTML templates are in /templates.
+    
+    Current File: {file_path}
+    
+    Task: Rewrite the following code to correct all file path references.
+    - HTML/JS: Update fetch() calls to point to 'data/filename.json'.
+    - HTML: Update link hrefs and img srcs to point to 'public/filename.ext' (or '../public/filename.ext' if the file is in a subdirectory).
+    - Python: Scripts in /src are executed from the root directory by GitHub Actions. Ensure open() calls point to 'data/filename.json' or 'templates/filename.html'.
+    - GitHub Actions YAML: Update run commands to 'python src/filename.py'.
+    
+    Return ONLY the raw, updated code. Do not include markdown formatting blocks like ```python.
+    
+    Code:
+    {original_code}
+    """
+
+    updated_code = client.generate(prompt).strip()
+
+    if updated_code.startswith("```"):
+        updated_code = "\n".join(updated_code.split('\n')[1:-1])
+
+    # Never overwrite an edit made while the model was working on the old text
+    with open(file_path, 'r', encoding='utf-8') as file:
+        if file.read() != original_code:
+            return "CHANGED DURING RUN (left for the next pass)"
+
+    write_atomic(file_path, updated_code)
+    mark_completed(state, file_path, updated_code)
+    return "REFACTORED"
+
+def execute_migration(workers=MAX_WORKERS, redo=False):
     print("GSN TERMINAL: Initialising architectural refactor...")
     
     # 1. Define Target Directories
@@ -31,7 +189,7 @@ def execute_migration():
     files = [f for f in os.listdir('.') if os.path.isfile(f)]
     mapping = {}
     
-    ignore_list = ['index.html', 'requirements.txt', 'README.md', 'CNAME', 'sitemap.xml', 'gsn_migration.py', 'folder_structure.txt']
+    ignore_list = ['index.html', 'requirements.txt', 'README.md', 'CNAME', 'sitemap.xml', 'gsn_migration.py', 'folder_structure.txt', STATE_FILE]
     
     for f in files:
         if f in ignore_list:
@@ -54,70 +212,29 @@ def execute_migration():
     # 4. Agentic Content Refactoring
     print("GSN TERMINAL: Commencing deep code refactor with State Caching. Please hold...")
     
-    completed_files = load_completed_files()
-    target_folders = ['.', 'src', 'templates', 'articles', '.github/workflows']
-    
-    for folder in target_folders:
-        if not os.path.exists(folder):
-            continue
-            
-        for root, dirs, filenames in os.walk(folder):
-            if '.git' in dirs:
-                dirs.remove('.git')
-            if '__pycache__' in dirs:
-                dirs.remove('__pycache__')
-                
-            for filename in filenames:
-                file_path = os.path.normpath(os.path.join(root, filename))
-                
-                if file_path in completed_files:
-                    print(f"SKIPPED (Already Refactored): {file_path}")
-                    continue
-                
-                if filename.endswith(('.png', '.jpg', '.jpeg', '.json', '.css', '.xml', '.zip', '.log', '.txt')) or filename == 'gsn_migration.py':
-                    continue
-                    
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        original_code = file.read()
-                except UnicodeDecodeError:
-                    print(f"SKIPPED (Binary Quarantine): {file_path}")
-                    continue
-                
-                prompt = f"""
-                You are the Lead Systems Architect for Global Shift Network.
-                The repository has been restructured. Python scripts are in /src. JSON data is in /data. CSS and Images are in /public. HTML templates are in /templates.
-                
-                Current File: {file_path}
-                
-                Task: Rewrite the following code to correct all file path references.
-                - HTML/JS: Update fetch() calls to point to 'data/filename.json'.
-                - HTML: Update link hrefs and img srcs to point to 'public/filename.ext' (or '../public/filename.ext' if the file is in a subdirectory).
-                - Python: Scripts in /src are executed from the root directory by GitHub Actions. Ensure open() calls point to 'data/filename.json' or 'templates/filename.html'.
-                - GitHub Actions YAML: Update run commands to 'python src/filename.py'.
-                
-                Return ONLY the raw, updated code. Do not include markdown formatting blocks like ```python.
-                
-                Code:
-                {original_code}
-                """
-                
-                response = client.models.generate_content(model=MODEL_ID, contents=prompt)
-                updated_code = response.text.strip()
-                
-                if updated_code.startswith("```"):
-                    updated_code = "\n".join(updated_code.split('\n')[1:-1])
-                
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(updated_code)
-                
-                mark_completed(file_path)
-                print(f"REFACTORED: {file_path}")
-                
-                # Heavy throttle to clear the Token bucket
-                time.sleep(15)
+    state = load_state()
+    targets = collect_targets(state, redo)
+    print(f"GSN TERMINAL: {len(targets)} files queued across {workers} workers.")
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(refactor_file, state, path, code): path for path, code in targets.items()}
+        for fut in as_completed(futures):
+            file_path = futures[fut]
+            try:
+                print(f"{fut.result()}: {file_path}")
+            except Exception as e:
+                failures += 1
+                print(f"FAILED (will retry on rerun): {file_path}: {e}")
 
+    print(f"GSN TERMINAL: {client.report()}")
+    if failures:
+        print(f"GSN TERMINAL: {failures} files failed. Rerun to resume; completed files are skipped.")
     print("GSN TERMINAL: Migration complete. Awaiting manual verification.")
 
 if __name__ == "__main__":
-    execute_migration()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Restructure the repository and refactor file paths with Gemini.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Concurrent refactor workers.")
+    parser.add_argument("--redo", action="store_true", help="Also refactor files edited since their last refactor.")
+    args = parser.parse_args()
+    execute_migration(args.workers, args.redo)
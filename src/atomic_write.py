@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+# GSN Terminal: Atomic Skip-If-Unchanged Writer
+# Every node writes its pages and exports through here. A file is replaced
+# (temp file + rename, so readers never see half a page) only when its content
+# really changed. Volatile parts such as `last_updated` stamps are left out of
+# the comparison, so a rerun with the same data leaves the file, its mtime and
+# git untouched. The manifest records when each output last changed, which the
+# sitemap uses for <lastmod> (mtimes are meaningless after a fresh checkout).
+
+MANIFEST_FILE = "data/content_hashes.json"
+
+_MANIFEST = None
+_LOCK = threading.Lock()
+
+
+def _load_manifest():
+    global _MANIFEST
+    if _MANIFEST is None:
+        try:
+            with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                _MANIFEST = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _MANIFEST = {}
+    return _MANIFEST
+
+
+def _replace(path, data):
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_text(path, text, stable=None):
+    """Atomically write text to path unless its stable content is unchanged.
+
+    `stable` is the version of the content used for comparison (defaults to
+    `text`); pass a rendering with volatile fields blanked out. Returns True
+    if the file was written.
+    """
+    return write_bytes(path, text.encode('utf-8'), stable)
+
+
+def write_bytes(path, data, stable=None):
+    """write_text for binary content such as precompressed siblings."""
+    digest = _digest(data if stable is None else stable.encode('utf-8'))
+    key = os.path.normpath(path).replace(os.sep, '/')
+
+    with _LOCK:
+        manifest = _load_manifest()
+        entry = manifest.get(key)
+        if os.path.exists(path):
+            if entry is not None and entry['sha256'] == digest:
+                return False
+            if entry is None:
+                # First sighting: adopt an identical existing file without touching it.
+                with open(path, 'rb') as f:
+                    if f.read() == data:
+                        manifest[key] = {"sha256": digest, "changed": _mtime_date(path)}
+                        _replace(MANIFEST_FILE, _dump_manifest(manifest))
+                        return False
+
+        _replace(path, data)
+        manifest[key] = {"sha256": digest, "changed": datetime.now().strftime('%Y-%m-%d')}
+        _replace(MANIFEST_FILE, _dump_manifest(manifest))
+    return True
+
+
+def write_json(path, data, volatile=(), **dump_kwargs):
+    """write_text for a JSON export; top-level keys in `volatile` are ignored when comparing."""
+    text = json.dumps(data, **dump_kwargs)
+    stable = None
+    if volatile and isinstance(data, dict):
+        stable = json.dumps({k: v for k, v in data.items() if k not in volatile}, sort_keys=True)
+    return write_text(path, text, stable)
+
+
+def last_changed(path):
+    """Date (YYYY-MM-DD) the content of path last changed, falling back to its mtime."""
+    entry = _load_manifest().get(os.path.normpath(path).replace(os.sep, '/'))
+    return entry['changed'] if entry else _mtime_date(path)
+
+
+def _mtime_date(path):
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d')
+
+
+def _dump_manifest(manifest):
+    return json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8')
@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from build import generate_dark_mode_card
+from card_renderer import CardRenderer, CARD_SIZE, CHROME_FLAGS
+import card_raster
+
+# GSN Terminal: Card Rendering Benchmark
+# Compares per-card latency of a fresh Html2Image browser per card (the old
+# build.py path), one persistent CardRenderer session, and the Pillow raster
+# backend. --compare renders one card through Chrome and Pillow and fails if
+# the two images drift apart (golden-image check).
+
+BATCH_SIZES = [1, 10, 100]
+
+# Mean absolute per-channel difference (0-255) allowed between the backends.
+# Chrome antialiasing and font hinting differ, so this is a layout check.
+GOLDEN_TOLERANCE = 6.0
+
+
+def card_args(i):
+    return (20 + (i % 60), "ELEVATED", "#f59e0b", "Market Volatility Normal", "Signal: NEWS FLOW", "▲")
+
+
+def sample_cards(count, out_dir):
+    jobs = []
+    for i in range(count):
+        html = generate_dark_mode_card(*card_args(i))
+        jobs.append((html, os.path.join(out_dir, f"bench_{i:03d}.png")))
+    return jobs
+
+
+def bench_html2image(jobs, out_dir):
+    from html2image import Html2Image
+
+    start = time.perf_counter()
+    for html, path in jobs:
+        hti = Html2Image(output_path=out_dir, size=CARD_SIZE, custom_flags=CHROME_FLAGS)
+        hti.screenshot(html_str=html, save_as=os.path.basename(path))
+    return time.perf_counter() - start
+
+
+def bench_session(jobs):
+    start = time.perf_counter()
+    with CardRenderer() as renderer:
+        renderer.render_many(jobs)
+    return time.perf_counter() - start
+
+
+def bench_pillow(count, out_dir):
+    start = time.perf_counter()
+    for i in range(count):
+        card_raster.render_card(*card_args(i), os.path.join(out_dir, f"raster_{i:03d}.png"))
+    return time.perf_counter() - start
+
+
+def compare_backends():
+    from PIL import Image, ImageChops, ImageStat
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        chrome_path, pillow_path = os.path.join(out_dir, "chrome.png"), os.path.join(out_dir, "pillow.png")
+        with CardRenderer() as renderer:
+            renderer.render(generate_dark_mode_card(*card_args(0)), chrome_path)
+        card_raster.render_card(*card_args(0), pillow_path)
+
+        chrome = Image.open(chrome_path).convert("RGB")
+        pillow = Image.open(pillow_path).convert("RGB")
+        if chrome.size != pillow.size:
+            print(f"❌ Size mismatch: chrome {chrome.size} vs pillow {pillow.size}")
+            return False
+        diff = ImageStat.Stat(ImageChops.difference(chrome, pillow)).mean
+        score = sum(diff) / len(diff)
+
+    verdict = "✅" if score <= GOLDEN_TOLERANCE else "❌"
+    print(f"{verdict} Mean pixel difference chrome vs pillow: {score:.2f} (tolerance {GOLDEN_TOLERANCE})")
+    return score <= GOLDEN_TOLERANCE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark card rendering backends.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--compare", action="store_true", help="Golden-image check of pillow against chrome.")
+    parser.add_argument("--pillow-only", action="store_true", help="Skip the Chrome backends.")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(0 if compare_backends() else 1)
+
+    print(f"{'cards':>6} | {'html2image ms/card':>18} | {'session ms/card':>15} | {'pillow ms/card':>14}")
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as out_dir:
+            pillow = bench_pillow(count, out_dir) / count * 1000
+            if args.pillow_only:
+                legacy = session = float('nan')
+            else:
+                jobs = sample_cards(count, out_dir)
+                legacy = bench_html2image(jobs, out_dir) / count * 1000
+                session = bench_session(jobs) / count * 1000
+        print(f"{count:>6} | {legacy:>18.1f} | {session:>15.1f} | {pillow:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import shutil
+import time
+import templating
+
+# GSN Terminal: Template Rendering Benchmark
+# Renders every page template N times with representative data and reports
+# per-page time for the old per-node `Template(open(...).read())` path versus
+# the shared templating Environment (cold with an on-disk bytecode cache, and
+# warm in-process).
+
+HEADLINES = [{"title": f"PLA drills reported near Kinmen ({i})", "link": "https://example.com"} for i in range(10)]
+
+SAMPLE_CONTEXTS = {
+    "ai_template.html": dict(final_score=62, status_text="ELEVATED", agi_years=4, agi_score=60, compute_score=55,
+                             capital_score=70, avg_pe=38.2, last_updated="17 Oct 2026 09:00", color_code="#f59e0b"),
+    "fiat_template.html": dict(score=58, status_text="EROSION OF TRUST", hard_trend=4.2, fiat_trend=-1.3,
+                               last_updated="17 Oct 2026"),
+    "fuel_template.html": dict(days_buffer=21.4, total_days=48.2, status_text="VULNERABLE", color_code="#f59e0b",
+                               comm_days=21.4, comm_m=342, spr_days=26.8, spr_m=428, iea_pct=53,
+                               top_headline="Tanker arrivals steady", last_updated="17 Oct 2026 09:00 AEST"),
+    "inequality_template.html": dict(fracture_score=12.4, asset_growth=18.2, survival_inflation=5.8,
+                                     last_updated="17 Oct 2026",
+                                     dates_10y=json.dumps([f"{y}-01" for y in range(2016, 2027)] * 12),
+                                     assets_10y=json.dumps([round(i * 0.7, 2) for i in range(132)]),
+                                     survival_10y=json.dumps([round(i * 0.3, 2) for i in range(132)]),
+                                     dates_1y=json.dumps([f"day {d}" for d in range(252)]),
+                                     assets_1y=json.dumps([round(d * 0.07, 2) for d in range(252)]),
+                                     survival_1y=json.dumps([round(d * 0.02, 2) for d in range(252)])),
+    "macro_template.html": dict(us_pos=72.5, china_pos=31.0, fiat_desc="EROSION OF TRUST", fiat_color="#f59e0b",
+                                fiat_ratio=5.4),
+    "middle_east_template.html": dict(risk_index=48, status_text="ELEVATED", color_code="#f59e0b", energy_spike=3.1,
+                                      defense_rotation=40, gulf_contagion=24, top_headline="Strait transits normal",
+                                      last_updated="17 Oct 2026 09:00 AEST"),
+    "report_template.html": dict(date_str="2026-10-17", risk_score=41, status_text="ELEVATED", market_score=38,
+                                 conflict_score=44, color_code="#f59e0b", daily_summary="Heightened rhetorical noise detected.",
+                                 market_evidence="Market Volatility Normal", headline_list=HEADLINES),
+    "supply_template.html": dict(stress_score=57, status_text="ELEVATED FRICTION", shipping_stress=6.2,
+                                 energy_stress=2.9, last_updated="17 Oct 2026"),
+    "taiwan_template.html": dict(risk_score=41, status_text="ELEVATED", market_score=38, conflict_score=44,
+                                 color_code="#f59e0b", last_updated="2026-10-17 09:00 AEST",
+                                 market_evidence="Market Volatility Normal", top_headline=HEADLINES[0]["title"],
+                                 trend_arrow="▲", trend_desc="Rising"),
+    "template.html": dict(risk_score=41, status_text="ELEVATED", market_score=38, conflict_score=44,
+                          color_code="#f59e0b", daily_summary="Heightened rhetorical noise detected.",
+                          last_updated="2026-10-17 09:00 AEST",
+                          history_json=json.dumps([{"date": f"2026-09-{d:02d}", "score": 30 + d} for d in range(1, 31)]),
+                          report_list=[{"url": f"reports/report_2026-10-{d:02d}.html", "date": f"2026-10-{d:02d}"} for d in range(17, 12, -1)],
+                          trend_arrow="▲", trend_desc="Rising", market_evidence="Market Volatility Normal",
+                          top_headline=HEADLINES[0]["title"], latest_report_url="reports/report_2026-10-17.html"),
+}
+
+
+def bench_legacy(name, context, runs):
+    from jinja2 import Template
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        with open(os.path.join(templating.TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+            Template(f.read()).render(**context)
+    return (time.perf_counter() - start) / runs
+
+
+def bench_cold(name, context):
+    """First render in a fresh Environment: load + compile (or bytecode cache hit) + render."""
+    templating._ENV = None
+    start = time.perf_counter()
+    templating.render(name, **context)
+    return time.perf_counter() - start
+
+
+def bench_warm(name, context, runs):
+    templating.render(name, **context)
+    start = time.perf_counter()
+    for _ in range(runs):
+        templating.render(name, **context)
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page template rendering.")
+    parser.add_argument("-n", "--runs", type=int, default=50, help="Renders per page.")
+    parser.add_argument("--clear-cache", action="store_true", help="Delete the bytecode cache first.")
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        shutil.rmtree(templating.BYTECODE_CACHE_DIR, ignore_errors=True)
+
+    print(f"{'page':<28} | {'legacy ms':>9} | {'cold ms':>8} | {'warm ms':>8} | speed-up")
+    totals = [0.0, 0.0, 0.0]
+    for name, context in SAMPLE_CONTEXTS.items():
+        legacy = bench_legacy(name, context, args.runs) * 1000
+        cold = bench_cold(name, context) * 1000
+        warm = bench_warm(name, context, args.runs) * 1000
+        totals = [t + v for t, v in zip(totals, (legacy, cold, warm))]
+        print(f"{name:<28} | {legacy:>9.2f} | {cold:>8.2f} | {warm:>8.2f} | {legacy / warm:.0f}x")
+    legacy, cold, warm = totals
+    print(f"{'all pages':<28} | {legacy:>9.2f} | {cold:>8.2f} | {warm:>8.2f} | {legacy / warm:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,67 @@ import sys
 import json
 import re
 import time
-from google import genai 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from atproto import Client 
+from atproto_client.request import Request
+import atomic_write
+import broadcast_outbox
+import llm_client
+import whisper_ledger
+import whisper_rank
 
 # ==========================================
 # PLATFORM POSTING FUNCTIONS
 # ==========================================
+# Every enabled platform posts at once on its own thread, so the broadcast
+# takes as long as the slowest platform rather than the sum of all four.
+# Each poster returns its post id and raises on failure; dispatch() turns
+# that into one result row per platform (status, latency, post id).
+
+REPORT_FILE = "data/broadcast_report.json"
+
+# Seconds per HTTP call (connect and read). A platform making two calls
+# (the X thread) can take up to twice this.
+PLATFORM_TIMEOUTS = {
+    "twitter": 20,
+    "bluesky": 20,
+    "telegram": 10,
+    "linkedin": 20,
+}
+
+
+class TimeoutSession(requests.Session):
+    """A pooled session that never waits forever: every call gets a timeout."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(*args, **kwargs)
+
+
+HTTP = TimeoutSession(10)
+
 
 def post_to_twitter(main_msg, reply_msg, keys):
-    try:
-        print("▶️ Initiating X (Twitter) Broadcast...")
-        client = tweepy.Client(
-            consumer_key=keys['api_key'],
-            consumer_secret=keys['api_secret'],
-            access_token=keys['access_token'],
-            access_token_secret=keys['access_secret']
-        )
-        main_response = client.create_tweet(text=main_msg, user_auth=True)
-        main_tweet_id = main_response.data['id']
-        print(f"✅ X Main Post Live! ID: {main_tweet_id}")
+    print("▶️ Initiating X (Twitter) Broadcast...")
+    client = tweepy.Client(
+        consumer_key=keys['api_key'],
+        consumer_secret=keys['api_secret'],
+        access_token=keys['access_token'],
+        access_token_secret=keys['access_secret']
+    )
+    # tweepy sets no timeout of its own
+    client.session = TimeoutSession(PLATFORM_TIMEOUTS['twitter'])
+    main_response = client.create_tweet(text=main_msg, user_auth=True)
+    main_tweet_id = main_response.data['id']
+    print(f"✅ X Main Post Live! ID: {main_tweet_id}")
 
+    # The main post is live: a failed reply must not mark X undelivered (a rerun would repost it).
+    try:
         reply_response = client.create_tweet(
             text=reply_msg, 
             in_reply_to_tweet_id=main_tweet_id, 
@@ -32,89 +73,107 @@ def post_to_twitter(main_msg, reply_msg, keys):
         )
         print(f"✅ X Thread Linked! ID: {reply_response.data['id']}")
     except Exception as e:
-        print(f"❌ X (Twitter) Broadcast Failed: {e}")
+        print(f"⚠️ X Thread Reply Failed (main post {main_tweet_id} stays delivered): {e}")
+    return main_tweet_id
 
 def post_to_bluesky(message, handle, app_password):
-    try:
-        print("▶️ Initiating Bluesky Broadcast...")
-        client = Client()
-        client.login(handle, app_password)
-        post = client.send_post(message)
-        print(f"✅ Bluesky Broadcast Live! URI: {post.uri}")
-    except Exception as e:
-        print(f"❌ Bluesky Broadcast Failed: {e}")
+    print("▶️ Initiating Bluesky Broadcast...")
+    client = Client(request=Request(timeout=PLATFORM_TIMEOUTS['bluesky']))
+    client.login(handle, app_password)
+    post = client.send_post(message)
+    print(f"✅ Bluesky Broadcast Live! URI: {post.uri}")
+    return post.uri
 
 def post_to_telegram(message, token, chat_id):
-    try:
-        print("▶️ Initiating Telegram Broadcast...")
-        url = f"https://api.telegram.org/bot{token}/sendMessage"
-        payload = {
-            "chat_id": chat_id,
-            "text": message,
-            "parse_mode": "HTML"
-        }
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        print("✅ Telegram Broadcast Live!")
-    except Exception as e:
-        print(f"❌ Telegram Broadcast Failed: {e}")
+    print("▶️ Initiating Telegram Broadcast...")
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    payload = {
+        "chat_id": chat_id,
+        "text": message,
+        "parse_mode": "HTML"
+    }
+    response = HTTP.post(url, json=payload, timeout=PLATFORM_TIMEOUTS['telegram'])
+    response.raise_for_status()
+    print("✅ Telegram Broadcast Live!")
+    return response.json().get('result', {}).get('message_id')
 
 def post_to_linkedin(message, token, author_urn):
+    print("▶️ Initiating LinkedIn Broadcast...")
+    url = "https://api.linkedin.com/v2/ugcPosts"
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "X-Restli-Protocol-Version": "2.0.0",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "author": f"urn:li:person:{author_urn}",
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {"text": message},
+                "shareMediaCategory": "NONE"
+            }
+        },
+        "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
+    }
+    response = HTTP.post(url, headers=headers, json=payload, timeout=PLATFORM_TIMEOUTS['linkedin'])
+    response.raise_for_status()
+    print("✅ LinkedIn Broadcast Live!")
+    return response.headers.get('x-restli-id') or response.json().get('id')
+
+def _timed(name, poster, args):
+    started = time.perf_counter()
+    result = {"platform": name, "status": "ok", "post_id": None, "error": None}
     try:
-        print("▶️ Initiating LinkedIn Broadcast...")
-        url = "https://api.linkedin.com/v2/ugcPosts"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "X-Restli-Protocol-Version": "2.0.0",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "author": f"urn:li:person:{author_urn}",
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {"text": message},
-                    "shareMediaCategory": "NONE"
-                }
-            },
-            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        print("✅ LinkedIn Broadcast Live!")
+        post_id = poster(*args)
+        result["post_id"] = None if post_id is None else str(post_id)
     except Exception as e:
-        print(f"❌ LinkedIn Broadcast Failed: {e}")
+        # requests, httpx (Bluesky) and tweepy each raise their own timeout type
+        timed_out = isinstance(e, (requests.Timeout, TimeoutError)) or 'timed out' in str(e).lower()
+        result["status"] = "timeout" if timed_out else "failed"
+        result["error"] = str(e)
+        print(f"❌ {name} Broadcast Failed: {e}")
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000)
+    return result
 
-# ==========================================
-# MAIN ORCHESTRATOR
-# ==========================================
+def dispatch(jobs, on_result=None):
+    """Post every (name, poster, args) job concurrently. Returns one result row per job.
 
-def main():
-    # 1. Pull API Secrets
-    gemini_key = os.getenv('GEMINI_API_KEY')
-    
-    twitter_keys = {
-        'api_key': os.getenv('TWITTER_API_KEY'),
-        'api_secret': os.getenv('TWITTER_API_SECRET'),
-        'access_token': os.getenv('TWITTER_ACCESS_TOKEN'),
-        'access_secret': os.getenv('TWITTER_ACCESS_SECRET')
-    }
-    
-    bluesky_handle = os.getenv('BLUESKY_HANDLE')
-    bluesky_password = os.getenv('BLUESKY_PASSWORD')
+    `on_result` is called (on this thread) with each row as soon as its
+    platform finishes, so a crash later in the run cannot lose a live post.
+    """
+    if not jobs:
+        return []
+    results = []
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = [pool.submit(_timed, name, poster, args) for name, poster, args in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+            if on_result:
+                on_result(results[-1])
+    return results
 
-    telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
-    telegram_chat = os.getenv('TELEGRAM_CHAT_ID')
-    
-    linkedin_token = os.getenv('LINKEDIN_ACCESS_TOKEN')
-    linkedin_urn = os.getenv('LINKEDIN_PERSON_URN') 
+def write_report(results, skipped, already=None):
+    results = results + [{"platform": name, "status": "delivered_earlier", "post_id": post_id, "error": None,
+                          "latency_ms": 0} for name, post_id in (already or {}).items()]
+    results = results + [{"platform": name, "status": "skipped", "post_id": None, "error": None, "latency_ms": 0}
+                         for name in skipped]
+    print("\n--- BROADCAST REPORT ---")
+    for r in results:
+        detail = r['post_id'] or r['error'] or ''
+        print(f"{r['platform']:<9} {r['status']:<17} {r['latency_ms']:>6} ms  {detail}")
+    atomic_write.write_json(REPORT_FILE, {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "platforms": results,
+    }, indent=4)
 
-    if not gemini_key:
+def compose_broadcast(gemini_key):
+    """Generate today's copy (steps 2-5). Returns the outbox message fields."""
+    llm = llm_client.LLMClient(api_key=gemini_key)
+    if not llm.available:
         print("❌ Missing GEMINI_API_KEY. System halting.")
         sys.exit(1)
 
-    ai_client = genai.Client(api_key=gemini_key)
-
     # 2. Load Telemetry & The Intelligence Backlog
     print("Loading GSN Orchestrator Telemetry and the Intelligence Backlog...")
     try:
@@ -123,25 +182,27 @@ def main():
         with open('data/active_alerts.json', 'r', encoding='utf-8') as f:
             alerts_data = json.load(f)
             
-        with open('data/whisper_ledger.json', 'r', encoding='utf-8') as f:
-            ledger_data = json.load(f)
-            
         exec_summary = briefing.get('executive_summary', 'Nominal variance.')
         alerts = alerts_data.get('alerts', [])
         alert_text = "\n".join([f"- {a['severity']} [{a['type']}]: {a['headline']}" for a in alerts]) if alerts else "No critical anomalies."
         
-        unpublished_whispers = [w for w in ledger_data.get('whispers', []) if w.get('status') == 'UNPUBLISHED']
-        
-        whisper_text = ""
-        for idx, w in enumerate(unpublished_whispers):
-            whisper_text += f"ID: {idx}\nKOL: {w['author']}\nContext: {w['snippet']}\n\n"
+        ledger = whisper_ledger.open_ledger()
+        backlog = whisper_ledger.unpublished(ledger)
+        published = whisper_ledger.recently_published(ledger, whisper_rank.NOVELTY_CORPUS)
+        ledger.close()
+
+        # Only a ranked shortlist goes to Gemini, so the prompt stays the same size as the backlog grows
+        unpublished_whispers = whisper_rank.shortlist(backlog, published, alerts)
+        whisper_text = "".join(whisper_rank.entry_text(idx, w) for idx, w in enumerate(unpublished_whispers))
+        print(f"🧮 Shortlisted {len(unpublished_whispers)} of {len(backlog)} unpublished whispers "
+              f"(~{whisper_rank.estimate_tokens(whisper_text)} tokens).")
             
         if not whisper_text:
             whisper_text = "No new KOL insights available today."
             
     except Exception as e:
         print(f"⚠️ Telemetry load error: {e}")
-        exec_summary, alert_text, whisper_text, alerts, unpublished_whispers, ledger_data = "Baseline nominal.", "None.", "None.", [], [], {"whispers": []}
+        exec_summary, alert_text, whisper_text, alerts, unpublished_whispers = "Baseline nominal.", "None.", "None.", [], []
 
     is_alert_day = len(alerts) > 0
 
@@ -170,25 +231,18 @@ def main():
     Following the ID tag, provide the broadcast copy. Do not include hashtags.
     """
 
-    # 4. Generate Bifurcated Copy via Gemini with Exponential Backoff
-    max_retries = 3
-    raw_ai_message = ""
-    
-    for attempt in range(max_retries):
-        try:
-            response = ai_client.models.generate_content(model='gemini-3.5-flash', contents=prompt)
-            raw_ai_message = response.text.strip()
-            break  
-        except Exception as api_err:
-            if attempt < max_retries - 1:
-                wait_time = (2 ** attempt) * 5  
-                print(f"⚠️ Gemini API Overloaded (503). Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-            else:
-                print(f"❌ AI Generation Failed after {max_retries} attempts: {api_err}")
-                sys.exit(1)
+    # 4. Generate Bifurcated Copy via the shared LLM client (rate limit, retries).
+    # Not cached: a failed run must be able to ask for fresh copy; the outbox keeps the day's stored copy.
+    try:
+        raw_ai_message = llm.generate(prompt, cache=False).strip()
+    except llm_client.LLMError as api_err:
+        print(f"❌ AI Generation Failed: {api_err}")
+        sys.exit(1)
+    print(f"GSN TERMINAL: {llm.report()}")
     
     # 4.5 THE BURN PROTOCOL: Robust ID Detection and Removal
+    # The chosen whisper is only burned once a platform confirms delivery (see broadcast_outbox).
+    whisper_id = None
     match = re.search(r'\[ID:\s*(\d+)\]', raw_ai_message)
     
     if match:
@@ -197,15 +251,8 @@ def main():
         
         if 0 <= chosen_id < len(unpublished_whispers):
             chosen_whisper = unpublished_whispers[chosen_id]
-            print(f"🔥 Burning Whisper: '{chosen_whisper['title']}' by {chosen_whisper['author']}")
-            
-            for w in ledger_data['whispers']:
-                if w['title'] == chosen_whisper['title'] and w['author'] == chosen_whisper['author']:
-                    w['status'] = 'PUBLISHED'
-                    break
-                    
-            with open('data/whisper_ledger.json', 'w', encoding='utf-8') as f:
-                json.dump(ledger_data, f, indent=4)
+            print(f"🔥 Whisper Selected: '{chosen_whisper['title']}' by {chosen_whisper['author']}")
+            whisper_id = chosen_whisper['id']
     else:
         ai_message = raw_ai_message
         if not is_alert_day:
@@ -228,6 +275,47 @@ def main():
         twitter_reply = f"Dive into the full institutional data, capital flight metrics, and cross-node correlations on the GSN Terminal:\n\n{report_url}"
         unified_full_message = f"{ai_message}\n\nLive Telemetry: {report_url}"
 
+    return {
+        "ai_message": ai_message,
+        "twitter_reply": twitter_reply,
+        "full_message": unified_full_message,
+        "whisper_id": whisper_id,
+    }
+
+# ==========================================
+# MAIN ORCHESTRATOR
+# ==========================================
+
+def main():
+    # 1. Pull API Secrets
+    gemini_key = os.getenv('GEMINI_API_KEY')
+    
+    twitter_keys = {
+        'api_key': os.getenv('TWITTER_API_KEY'),
+        'api_secret': os.getenv('TWITTER_API_SECRET'),
+        'access_token': os.getenv('TWITTER_ACCESS_TOKEN'),
+        'access_secret': os.getenv('TWITTER_ACCESS_SECRET')
+    }
+    
+    bluesky_handle = os.getenv('BLUESKY_HANDLE')
+    bluesky_password = os.getenv('BLUESKY_PASSWORD')
+
+    telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
+    telegram_chat = os.getenv('TELEGRAM_CHAT_ID')
+    
+    linkedin_token = os.getenv('LINKEDIN_ACCESS_TOKEN')
+    linkedin_urn = os.getenv('LINKEDIN_PERSON_URN') 
+
+    # 2-5. Today's copy: resume it from the outbox after a partial run, or generate it
+    outbox = broadcast_outbox.open_outbox()
+    day = broadcast_outbox.today()
+    message = broadcast_outbox.message_for(outbox, day)
+    if message:
+        print(f"📬 Resuming today's broadcast from the outbox ({message['hash'][:12]}). Skipping generation.")
+    else:
+        message = broadcast_outbox.add_message(outbox, day, **compose_broadcast(gemini_key))
+    already = broadcast_outbox.delivered(outbox, message['id'])
+
     # 6. EXECUTE BROADCAST MATRIX
     print("\n--- INITIATING MODULAR BROADCAST MATRIX ---")
     
@@ -235,26 +323,36 @@ def main():
     run_bluesky = os.getenv('RUN_BLUESKY') == 'true'
     run_telegram = os.getenv('RUN_TELEGRAM') == 'true'
     run_linkedin = os.getenv('RUN_LINKEDIN') == 'true'
-    
-    if run_twitter and all(twitter_keys.values()):
-        post_to_twitter(ai_message, twitter_reply, twitter_keys)
-    else:
-        print("⏭️ Skipping X (Twitter): Disabled by user or missing keys.")
 
-    if run_bluesky and bluesky_handle and bluesky_password:
-        post_to_bluesky(unified_full_message, bluesky_handle, bluesky_password)
-    else:
-        print("⏭️ Skipping Bluesky: Disabled by user or missing keys.")
+    ai_message = message['ai_message']
+    unified_full_message = message['full_message']
+    platforms = [
+        ("twitter", "X (Twitter)", run_twitter and all(twitter_keys.values()),
+         post_to_twitter, (ai_message, message['twitter_reply'], twitter_keys)),
+        ("bluesky", "Bluesky", run_bluesky and bluesky_handle and bluesky_password,
+         post_to_bluesky, (unified_full_message, bluesky_handle, bluesky_password)),
+        ("telegram", "Telegram", run_telegram and telegram_token and telegram_chat,
+         post_to_telegram, (unified_full_message, telegram_token, telegram_chat)),
+        ("linkedin", "LinkedIn", run_linkedin and linkedin_token and linkedin_urn,
+         post_to_linkedin, (unified_full_message, linkedin_token, linkedin_urn)),
+    ]
+    jobs, skipped = [], []
+    for name, display, enabled, poster, args in platforms:
+        if name in already:
+            print(f"✅ {display}: Already delivered today (ID: {already[name]}). Not reposting.")
+        elif enabled:
+            jobs.append((name, poster, args))
+        else:
+            print(f"⏭️ Skipping {display}: Disabled by user or missing keys.")
+            skipped.append(name)
 
-    if run_telegram and telegram_token and telegram_chat:
-        post_to_telegram(unified_full_message, telegram_token, telegram_chat)
-    else:
-        print("⏭️ Skipping Telegram: Disabled by user or missing keys.")
+    def record(result):
+        if broadcast_outbox.record_deliveries(outbox, message, [result]):
+            print(f"🔥 Burned Whisper #{message['whisper_id']} (delivery confirmed).")
 
-    if run_linkedin and linkedin_token and linkedin_urn:
-        post_to_linkedin(unified_full_message, linkedin_token, linkedin_urn)
-    else:
-        print("⏭️ Skipping LinkedIn: Disabled by user or missing keys.")
+    results = dispatch(jobs, on_result=record)
+    outbox.close()
+    write_report(results, skipped, already)
 
     print("--- MATRIX BROADCAST COMPLETE ---")
 
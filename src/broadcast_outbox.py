@@ -0,0 +1,112 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import whisper_ledger
+
+# GSN Terminal: Broadcast Outbox
+# Durable delivery state for the broadcast matrix. Each day's generated copy
+# is stored once, with a content hash and one delivery row per platform. A
+# rerun picks the stored copy back up (no second LLM call) and only posts to
+# platforms not yet confirmed. The whisper ledger is attached to the same
+# connection, so recording a delivery and burning its whisper commit together.
+
+OUTBOX_DB = "data/broadcast_outbox.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL UNIQUE,
+    hash TEXT NOT NULL,
+    ai_message TEXT NOT NULL,
+    twitter_reply TEXT NOT NULL,
+    full_message TEXT NOT NULL,
+    whisper_id INTEGER,
+    burned INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    message_id INTEGER NOT NULL REFERENCES messages (id),
+    platform TEXT NOT NULL,
+    status TEXT NOT NULL,
+    post_id TEXT,
+    error TEXT,
+    latency_ms INTEGER,
+    attempted_at TEXT NOT NULL,
+    PRIMARY KEY (message_id, platform)
+) WITHOUT ROWID;
+"""
+
+
+def open_outbox(path=OUTBOX_DB, ledger_path=whisper_ledger.LEDGER_DB):
+    """Open (and on first use create) the outbox with the whisper ledger attached as `ledger`."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    whisper_ledger.open_ledger(ledger_path).close()
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    conn.execute("ATTACH DATABASE ? AS ledger", (ledger_path,))
+    return conn
+
+
+def today():
+    """The broadcast day (the idempotency key), in Brisbane time like the rest of the terminal."""
+    import pytz
+
+    return datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%Y-%m-%d')
+
+
+def content_hash(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+
+def message_for(conn, day):
+    """The message generated for `day` as a dict, or None if there is none yet."""
+    row = conn.execute("SELECT * FROM messages WHERE day = ?", (day,)).fetchone()
+    return dict(row) if row else None
+
+
+def add_message(conn, day, ai_message, twitter_reply, full_message, whisper_id=None):
+    """Store the day's copy before anything is posted. Returns it as a dict."""
+    with conn:
+        conn.execute(
+            "INSERT INTO messages (day, hash, ai_message, twitter_reply, full_message, whisper_id, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (day, content_hash(ai_message, twitter_reply, full_message), ai_message, twitter_reply,
+             full_message, whisper_id, datetime.now(timezone.utc).isoformat(timespec='seconds')),
+        )
+    return message_for(conn, day)
+
+
+def delivered(conn, message_id):
+    """{platform: post_id} for every platform that confirmed this message."""
+    rows = conn.execute(
+        "SELECT platform, post_id FROM deliveries WHERE message_id = ? AND status = 'ok'", (message_id,))
+    return {row['platform']: row['post_id'] for row in rows}
+
+
+def record_deliveries(conn, message, results):
+    """Store dispatch results and, once anything went out, burn the whisper — in one transaction.
+
+    A confirmed platform is never downgraded by a later failed attempt.
+    """
+    stamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    with conn:
+        for r in results:
+            conn.execute(
+                "INSERT INTO deliveries (message_id, platform, status, post_id, error, latency_ms, attempted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (message_id, platform) DO UPDATE SET status = excluded.status, "
+                "post_id = excluded.post_id, error = excluded.error, latency_ms = excluded.latency_ms, "
+                "attempted_at = excluded.attempted_at WHERE deliveries.status != 'ok'",
+                (message['id'], r['platform'], r['status'], r['post_id'], r['error'], r['latency_ms'], stamp),
+            )
+        confirmed = conn.execute(
+            "SELECT 1 FROM deliveries WHERE message_id = ? AND status = 'ok' LIMIT 1", (message['id'],)).fetchone()
+        burned = conn.execute("SELECT burned FROM messages WHERE id = ?", (message['id'],)).fetchone()['burned']
+        if confirmed and message['whisper_id'] is not None and not burned:
+            conn.execute("UPDATE ledger.whispers SET status = 'PUBLISHED' WHERE id = ?", (message['whisper_id'],))
+            conn.execute("UPDATE messages SET burned = 1 WHERE id = ?", (message['id'],))
+            return True
+    return False
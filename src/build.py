@@ -1,26 +1,46 @@
-import yfinance as yf
-import feedparser
-from textblob import TextBlob
-from jinja2 import Template
+# Heavy dependencies (pandas/yfinance, feedparser, textblob, jinja2, pytz,
+# html2image) are imported inside the stage that needs them, so a
+# template-only rebuild does not pay for the market and browser stacks.
 from datetime import datetime, timedelta
-import pytz
+import argparse
 import json
 import os
 import random
 import glob
 import time
-from html2image import Html2Image
+import atomic_write
+import card_cache
+import market_data
+import risk_history
+import feed_fetcher
+import headline_scoring
+import telemetry
+import templating
 
 # --- CONFIG ---
 MARKET_WEIGHT = 0.5
 CONFLICT_WEIGHT = 0.5
 
+STAGES = ["fetch", "score", "card", "report", "page"]
+STATE_FILE = "data/taiwan_state.json"
+
+# Card backend: "chrome" screenshots the HTML card in headless Chrome,
+# "pillow" draws the same layout directly (no browser required).
+CARD_BACKENDS = ["chrome", "pillow"]
+CARD_BACKEND = os.environ.get("CARD_BACKEND", "chrome")
+
+# Ordered from "Scary" to "Standard"
+WARNING_WORDS = ["missile", "blockade", "live-fire", "invasion", "jets", "incursion", "drill", "exercise"]
+CONFLICT_SCORER = headline_scoring.KeywordScorer(WARNING_WORDS)
+
+market_data.register(['TSM', 'SPY'], '5d')
+
 # --- 1. DATA GATHERING ---
 
 def get_market_risk():
     try:
-        tsm = yf.Ticker("TSM").history(period="5d")
-        spy = yf.Ticker("SPY").history(period="5d")
+        tsm = market_data.history("TSM", "5d")
+        spy = market_data.history("SPY", "5d")
         
         if len(tsm) < 2 or len(spy) < 2: 
             return {"score": 30, "desc": "Market Closed"}
@@ -44,36 +64,23 @@ def get_market_risk():
         return {"score": 30, "desc": "Data unavailable"}
 
 def get_conflict_risk():
+    import numpy as np
+
     try:
         rss_url = "https://news.google.com/rss/search?q=Taiwan+China+conflict+when:1d&hl=en-US&gl=US&ceid=US:en"
-        feed = feedparser.parse(rss_url)
+        feed = feed_fetcher.parse(rss_url)
         entries = feed.entries[:20]
         
         if not entries: 
             return {"score": 30, "headlines": [], "top_phrase": "No Signals"}
         
-        sentiment_score = 0
-        keyword_hits = 0
-        # Ordered from "Scary" to "Standard"
-        warning_words = ["missile", "blockade", "live-fire", "invasion", "jets", "incursion", "drill", "exercise"]
-        triggered_headlines = []
-        
-        for entry in entries:
-            title = entry.title
-            title_lower = title.lower()
-            hit = False
-            for word in warning_words:
-                if word in title_lower:
-                    keyword_hits += 1
-                    hit = True
-            
-            blob = TextBlob(title)
-            sentiment_score += blob.sentiment.polarity
-            
-            if hit and len(triggered_headlines) < 3:
-                triggered_headlines.append(title)
+        titles = [entry.title for entry in entries]
+        hits = CONFLICT_SCORER.hits(titles)
+        keyword_hits = int(hits.sum())
+        triggered_rows = np.flatnonzero(hits.any(axis=1))[:3]
+        triggered_headlines = [titles[i] for i in triggered_rows]
             
-        avg_sentiment = sentiment_score / len(entries)
+        avg_sentiment = float(headline_scoring.sentiment(titles).mean())
         sentiment_risk = 50 - (avg_sentiment * 50) 
         keyword_risk = keyword_hits * 5
         total = (sentiment_risk * 0.6) + (keyword_risk * 0.4)
@@ -86,10 +93,9 @@ def get_conflict_risk():
             if final_score < 60:
                  top_phrase = "Signal: NEWS FLOW"
             else:
-                for word in warning_words:
-                    if any(word in h.lower() for h in triggered_headlines):
-                        top_phrase = f"Signal: {word.upper()}"
-                        break
+                # First warning word (in severity order) present in the triggered headlines
+                top_word = np.flatnonzero(hits[triggered_rows].any(axis=0))[0]
+                top_phrase = f"Signal: {WARNING_WORDS[top_word].upper()}"
 
         return {
             "score": final_score,
@@ -103,7 +109,8 @@ def get_conflict_risk():
 
 # --- 2. VISUALS GENERATION ---
 
-def generate_dark_mode_card(score, status, color, market_desc, conflict_phrase, trend_arrow):
+def generate_dark_mode_card(score, status, color, market_desc, conflict_phrase, trend_arrow, date_str=None):
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
     html_str = f"""
     <!DOCTYPE html>
     <html>
@@ -138,7 +145,7 @@ def generate_dark_mode_card(score, status, color, market_desc, conflict_phrase,
             <div class="right-panel">
                 <div class="intel-row"><div class="intel-label">CONFLICT SIGNALS</div><div class="intel-value">{conflict_phrase}</div></div>
                 <div class="intel-row"><div class="intel-label">MARKET SENTIMENT</div><div class="intel-value">{market_desc}</div></div>
-                <div class="intel-row"><div class="intel-label">DATE</div><div class="intel-value">{datetime.now().strftime('%Y-%m-%d')}</div></div>
+                <div class="intel-row"><div class="intel-label">DATE</div><div class="intel-value">{date_str}</div></div>
             </div>
             <div class="footer">TAIWANSTRAITTRACKER.COM // OSINT AUTOMATION</div>
         </div>
@@ -169,13 +176,20 @@ def prepare_clickbait_tweet(status, score, summary, headlines, market_desc):
     tags = "\n\n#Taiwan #China #OSINT #Geopolitics #TSMC"
     return f"{hook}{reason}{tags}\n{base_url}"
 
-# --- 3. MAIN EXECUTION ---
+# --- 3. PIPELINE STAGES ---
+# Each stage reads and extends a shared state dict. The dict is saved to
+# STATE_FILE after every run, so a subset of stages (e.g. --stage page) can
+# re-render from the last fetched data without touching the network.
 
-def main():
-    print("Starting Build Process...")
+def stage_fetch(state):
+    state['market'] = get_market_risk()
+    state['conflict'] = get_conflict_risk()
 
-    market_data = get_market_risk()
-    conflict_data = get_conflict_risk()
+def stage_score(state):
+    import pytz
+
+    market_data = state['market']
+    conflict_data = state['conflict']
     market_score = market_data['score']
     conflict_score = conflict_data['score']
     final_score = int((market_score * MARKET_WEIGHT) + (conflict_score * CONFLICT_WEIGHT))
@@ -187,70 +201,90 @@ def main():
     else:
         status = "HIGH RISK"; color = "#ef4444"; summary = "Significant anomaly detected."
 
-    # Around line where today_str is defined, add this:
     today_str = datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%Y-%m-%d')
-    update_time = datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%Y-%m-%d %H:%M AEST')  # ADD THIS
-    try:
-        with open('data/history.json', 'r', encoding='utf-8') as f: history = json.load(f)
-    except: history = []
+    update_time = datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%Y-%m-%d %H:%M AEST')
+    conn = risk_history.open_history()
+    previous = risk_history.previous(conn, today_str)
 
-    last_score = history[-1]['score'] if history else final_score
+    last_score = previous['final'] if previous else final_score
     score_change = final_score - last_score
     if score_change > 0: trend_arrow = "▲"; trend_desc = f"+{score_change}"
     elif score_change < 0: trend_arrow = "▼"; trend_desc = f"{score_change}"
     else: trend_arrow = "■"; trend_desc = "-"
 
-    history = [entry for entry in history if entry['date'] != today_str]
-    history.append({"date": today_str, "score": final_score})
-    history = history[-30:]
-    with open('data/history.json', 'w', encoding='utf-8') as f: json.dump(history, f)
+    risk_history.record(conn, today_str, final_score, market_score, conflict_score)
+    history = risk_history.recent(conn, 30)
+    history_windows = risk_history.windows(conn, today_str)
+    conn.close()
+    # 30-day list kept for build_macro and older readers
+    atomic_write.write_json('data/history.json', history)
 
-    print("Generating Situation Room Card...")
-    card_html = generate_dark_mode_card(final_score, status, color, market_data['desc'], conflict_data['top_phrase'], trend_arrow)
-    
-    final_image_url = ""
+    # Export for the orchestrator
+    tw_export = {
+        "current_risk_score": final_score,
+        "media_noise": conflict_score,
+        "daily_change": score_change
+    }
+    atomic_write.write_json('data/taiwan_data.json', tw_export)
+    telemetry.record("taiwan", {**tw_export, "market_score": market_score}, final_score, status, day=today_str)
+
+    state.update({
+        "final_score": final_score, "status": status, "color": color, "summary": summary,
+        "today_str": today_str, "update_time": update_time, "history": history,
+        "history_windows": history_windows,
+        "trend_arrow": trend_arrow, "trend_desc": trend_desc,
+    })
+
+def stage_card(state):
+    print(f"Generating Situation Room Card ({CARD_BACKEND})...")
+    card_args = (state['final_score'], state['status'], state['color'], state['market']['desc'], state['conflict']['top_phrase'], state['trend_arrow'])
+    today_str = state['today_str']
+
+    state['image_url'] = ""
     try:
-        hti = Html2Image(output_path='public', size=(1200, 628), custom_flags=['--no-sandbox', '--disable-gpu', '--hide-scrollbars'])
         os.makedirs('public', exist_ok=True)
-        new_filename = f"card_{today_str}_s{final_score}.png"
-        for f in glob.glob(f"public/card_{today_str}*.png"): os.remove(f)
-        hti.screenshot(html_str=card_html, save_as=new_filename)
-        final_image_url = f"https://raw.githubusercontent.com/RiskIndicator/taiwan-strait-risk-tracker/main/public/{new_filename}"
-        print(f"✅ Card Generated: {new_filename}")
+        key = card_cache.card_key(card_args, today_str, CARD_BACKEND)
+        new_filename = card_cache.lookup(key)
+        if new_filename:
+            print(f"✅ Card Unchanged: {new_filename} (cache hit)")
+        else:
+            new_filename = f"card_{today_str}_s{state['final_score']}.png"
+            for f in glob.glob(f"public/card_{today_str}*.png"): os.remove(f)
+            if CARD_BACKEND == "pillow":
+                from card_raster import render_card
+                render_card(*card_args, os.path.join('public', new_filename), date_str=today_str)
+            else:
+                from card_renderer import CardRenderer
+                with CardRenderer() as renderer:
+                    renderer.render(generate_dark_mode_card(*card_args, date_str=today_str), os.path.join('public', new_filename))
+            card_cache.record(key, new_filename)
+            print(f"✅ Card Generated: {new_filename}")
+        state['image_url'] = f"https://raw.githubusercontent.com/RiskIndicator/taiwan-strait-risk-tracker/main/public/{new_filename}"
     except Exception as e:
         print(f"❌ Screenshot Error: {e}")
 
-    tweet_content = prepare_clickbait_tweet(status, final_score, summary, conflict_data['headlines'], market_data['desc'])
-
-    # --- THE FIX STARTS HERE ---
-    
-    # 1. Generate Daily Report first
+def stage_report(state):
     os.makedirs('reports', exist_ok=True)
-    report_filename = f"report_{today_str}.html"
-    report_filepath = os.path.join('reports', report_filename)
+    report_filepath = os.path.join('reports', f"report_{state['today_str']}.html")
     
     try:
-        with open('templates/report_template.html', 'r', encoding='utf-8') as f:
-            report_template = Template(f.read())
-            
-        rendered_report = report_template.render(
-            date_str=today_str,
-            risk_score=final_score,
-            status_text=status,
-            market_score=market_score,
-            conflict_score=conflict_score,
-            color_code=color,
-            daily_summary=summary,
-            market_evidence=market_data['desc'],
-            headline_list=conflict_data['headlines']
+        templating.render_page('report_template.html', report_filepath,
+            date_str=state['today_str'],
+            risk_score=state['final_score'],
+            status_text=state['status'],
+            market_score=state['market']['score'],
+            conflict_score=state['conflict']['score'],
+            color_code=state['color'],
+            daily_summary=state['summary'],
+            market_evidence=state['market']['desc'],
+            headline_list=state['conflict']['headlines']
         )
-        with open(report_filepath, 'w', encoding='utf-8') as f:
-            f.write(rendered_report)
         print(f"✅ Report Generated: {report_filepath}")
     except Exception as e:
         print(f"❌ Report Generation Error: {e}")
 
-    # 2. Build the Archive List
+def stage_page(state):
+    # 1. Build the Archive List
     report_files = sorted(glob.glob('reports/report_*.html'), reverse=True)[:5]
     recent_reports = []
     for file_path in report_files:
@@ -261,56 +295,80 @@ def main():
             'date': date_part
         })
 
-    # --- 3. SAVE THE TAIWAN DETAILED PAGE ---
-
+    # 2. Save the Taiwan detailed page
+    headlines = state['conflict']['headlines']
     try:
-        with open('templates/template.html', 'r', encoding='utf-8') as f:
-            main_template = Template(f.read())
-
-        rendered_html = main_template.render(
-            risk_score=final_score,
-            status_text=status,
-            market_score=market_score,
-            conflict_score=conflict_score,
-            color_code=color,
-            daily_summary=summary,
-            last_updated=update_time,
-            history_json=json.dumps(history),
+        templating.render_page('template.html', 'taiwan.html',
+            risk_score=state['final_score'],
+            status_text=state['status'],
+            market_score=state['market']['score'],
+            conflict_score=state['conflict']['score'],
+            color_code=state['color'],
+            daily_summary=state['summary'],
+            last_updated=state['update_time'],
+            history_json=json.dumps(state['history']),
+            history_windows_json=json.dumps(state.get('history_windows', {})),
             report_list=recent_reports, 
-            trend_arrow=trend_arrow,
-            trend_desc=trend_desc,
-            market_evidence=market_data['desc'],
-            top_headline=conflict_data['headlines'][0] if conflict_data['headlines'] else "No news flow",
-            latest_report_url=f"reports/{report_filename}" 
+            trend_arrow=state['trend_arrow'],
+            trend_desc=state['trend_desc'],
+            market_evidence=state['market']['desc'],
+            top_headline=headlines[0] if headlines else "No news flow",
+            latest_report_url=f"reports/report_{state['today_str']}.html" 
         )
 
-        # Update the file name here from index.html to taiwan.html
-        with open('taiwan.html', 'w', encoding='utf-8') as f:
-            f.write(rendered_html)
         print("✅ Taiwan Detail Page Generated (taiwan.html)")
 
     except Exception as e:
         print(f"❌ Taiwan Page Update Error: {e}")
 
-    # --- 4. EXPORT DATA FOR GITHUB ACTIONS ---
-    if 'GITHUB_OUTPUT' in os.environ:
-        export_headline = conflict_data['headlines'][0] if conflict_data['headlines'] else "Standard market variance detected."
-        with open(os.environ['GITHUB_OUTPUT'], 'a') as fh:
-            print("tweet<<EOF", file=fh)
-            print(tweet_content, file=fh)
-            print("EOF", file=fh)
-            print(f"image_url={final_image_url}", file=fh)
-            print(f"risk_score={final_score}", file=fh)
-            print(f"top_headline={export_headline}", file=fh)
-
-    # --- 5. EXPORT FOR ORCHESTRATOR ---
-    tw_export = {
-        "current_risk_score": final_score,
-        "media_noise": conflict_score,
-        "daily_change": score_change
-    }
-    with open('data/taiwan_data.json', 'w') as f:
-        json.dump(tw_export, f)
+STAGE_FUNCS = {
+    "fetch": stage_fetch,
+    "score": stage_score,
+    "card": stage_card,
+    "report": stage_report,
+    "page": stage_page,
+}
+
+def export_github_output(state):
+    headlines = state['conflict']['headlines']
+    tweet_content = prepare_clickbait_tweet(state['status'], state['final_score'], state['summary'], headlines, state['market']['desc'])
+    export_headline = headlines[0] if headlines else "Standard market variance detected."
+    with open(os.environ['GITHUB_OUTPUT'], 'a') as fh:
+        print("tweet<<EOF", file=fh)
+        print(tweet_content, file=fh)
+        print("EOF", file=fh)
+        print(f"image_url={state.get('image_url', '')}", file=fh)
+        print(f"risk_score={state['final_score']}", file=fh)
+        print(f"top_headline={export_headline}", file=fh)
+
+# --- 4. MAIN EXECUTION ---
+
+def main(stages=None, card_backend=None):
+    global CARD_BACKEND
+    CARD_BACKEND = card_backend or CARD_BACKEND
+    stages = [s for s in STAGES if s in (stages or STAGES)]
+    print(f"Starting Build Process ({', '.join(stages)})...")
+
+    state = {}
+    if stages[0] != "fetch":
+        try:
+            with open(STATE_FILE, 'r', encoding='utf-8') as f: state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            print(f"❌ No saved state in {STATE_FILE}. Run the fetch stage first.")
+            return
+
+    for stage in stages:
+        STAGE_FUNCS[stage](state)
+
+    # update_time alone is not a change worth a commit
+    atomic_write.write_json(STATE_FILE, state, volatile=('update_time',))
+
+    if 'GITHUB_OUTPUT' in os.environ and 'final_score' in state:
+        export_github_output(state)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build the Taiwan Strait risk node.")
+    parser.add_argument("--stage", nargs="+", choices=STAGES, help="Run only these stages (default: all).")
+    parser.add_argument("--card-backend", choices=CARD_BACKENDS, help="Card renderer (default: $CARD_BACKEND or chrome).")
+    args = parser.parse_args()
+    main(args.stage, args.card_backend)
@@ -1,15 +1,19 @@
 import yfinance as yf
-import feedparser
 from textblob import TextBlob
-from jinja2 import Template
+import atomic_write
+import telemetry
+import templating
 import json
 import numpy as np
 from datetime import datetime
 import pytz
 import os
+import feed_fetcher
+import headline_scoring
 
 # --- CONFIGURATION ---
 MAG_7 = ['NVDA', 'MSFT', 'GOOGL', 'META', 'AMZN', 'TSLA', 'AAPL']
+URGENCY_SCORER = headline_scoring.KeywordScorer(['sooner', 'breakthrough', 'close', 'imminent', 'fast', 'achieve', 'accelerate', 'ahead'])
 
 def get_capital_frenzy():
     print("Fetching Mag 7 Valuation Data...")
@@ -59,11 +63,11 @@ def get_agi_timeline():
     try:
         # Scrape news for AGI timeline shifts
         rss_url = "https://news.google.com/rss/search?q=AGI+Artificial+General+Intelligence+timeline&hl=en-US&gl=US&ceid=US:en"
-        feed = feedparser.parse(rss_url)
+        feed = feed_fetcher.parse(rss_url)
         
         # Look for acceleration trigger words in the headlines
-        urgency_words = ['sooner', 'breakthrough', 'close', 'imminent', 'fast', 'achieve', 'accelerate', 'ahead']
-        urgency_mentions = sum(1 for entry in feed.entries[:20] if any(w in entry.title.lower() for w in urgency_words))
+        titles = [entry.title for entry in feed.entries[:20]]
+        urgency_mentions = int(URGENCY_SCORER.hits(titles).any(axis=1).sum())
         
         # Base AGI consensus is roughly 5.0 years out. High urgency drops the timeline.
         base_years = 5.0
@@ -106,16 +110,13 @@ def build_index():
     }
     
     # Save with the NEW name the frontend is looking for
-    with open('data/ai_disruption_data.json', 'w') as f: 
-        json.dump(ai_export, f)
+    atomic_write.write_json('data/ai_disruption_data.json', ai_export)
+    telemetry.record("ai", {**ai_export, "agi_score": agi_score, "avg_pe": avg_pe}, final_score, status)
     print("Success: ai_disruption_data.json generated.")
 
     # EXPORT 2: The HTML Page
     try:
-        with open('templates/ai_template.html', 'r', encoding='utf-8') as f:
-            template = Template(f.read())
-
-        rendered_html = template.render(
+        templating.render_page('ai_template.html', 'ai-disruption.html',
             final_score=final_score,
             status_text=status,
             agi_years=agi_years,
@@ -127,10 +128,6 @@ def build_index():
             color_code=get_color_code(final_score)
         )
 
-        # Output to the NEW HTML filename
-        with open('ai-disruption.html', 'w', encoding='utf-8') as f:
-            f.write(rendered_html)
-        
         print("Success: ai-disruption.html generated.")
     except Exception as e:
         print(f"Note: HTML not generated. Awaiting template update. Error: {e}")
@@ -1,13 +1,17 @@
-import yfinance as yf
-from jinja2 import Template
+import atomic_write
+import telemetry
+import templating
 from datetime import datetime
 import pytz
-import json
+import market_data
+
+FIAT_BASKET = ['GLD', 'BTC-USD', 'TLT', 'UUP']
+market_data.register(FIAT_BASKET, '3mo')
 
 def build_fiat_confidence():
     print("CALCULATING FIAT SOVEREIGNTY...")
     try:
-        raw_data = yf.download(['GLD', 'BTC-USD', 'TLT', 'UUP'], period="3mo")['Close']
+        raw_data = market_data.closes(FIAT_BASKET, "3mo")
         
         data = raw_data.ffill().dropna()
         
@@ -23,10 +27,7 @@ def build_fiat_confidence():
         update_time = datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%d %b %Y')
 
         # Jinja2 Rendering for your existing fiat page
-        with open('templates/fiat_template.html', 'r', encoding='utf-8') as f:
-            template = Template(f.read())
-
-        rendered = template.render(
+        templating.render_page('fiat_template.html', 'fiat.html',
             score=score,
             status_text=status,
             hard_trend=round((hard_assets-1)*100, 1),
@@ -34,9 +35,6 @@ def build_fiat_confidence():
             last_updated=update_time
         )
         
-        with open('fiat.html', 'w', encoding='utf-8') as f:
-            f.write(rendered)
-            
         print(f"Success: fiat.html generated.")
 
         # --- NEW EXPORT FOR MACRO PAGE ---
@@ -47,8 +45,8 @@ def build_fiat_confidence():
             "color": color,
             "ratio": round(float(divergence), 2)
         }
-        with open('data/fiat_data.json', 'w') as f:
-            json.dump(macro_data, f)
+        atomic_write.write_json('data/fiat_data.json', macro_data)
+        telemetry.record("fiat", macro_data, score, status)
         print("Success: fiat_data.json exported for Macro dashboard.")
         # ---------------------------------
 
@@ -56,8 +54,7 @@ def build_fiat_confidence():
         print(f"Error: {e}")
         # Create fallback data if the API fails
         fallback = {"score": 50, "desc": "Data Error", "color": "#64748b", "ratio": 0}
-        with open('data/fiat_data.json', 'w') as f:
-            json.dump(fallback, f)
+        atomic_write.write_json('data/fiat_data.json', fallback)
 
 if __name__ == "__main__":
     build_fiat_confidence()
\ No newline at end of file
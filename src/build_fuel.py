@@ -1,7 +1,9 @@
 import os
 import requests
-import feedparser
-from jinja2 import Template
+import feed_fetcher
+import atomic_write
+import telemetry
+import templating
 from datetime import datetime
 import pytz
 import json
@@ -74,17 +76,16 @@ def build_fuel_index():
 
     # Save absolute source of truth to cache
     if not is_cached:
-        with open(CACHE_FILE, 'w') as f:
-            json.dump({
-                "comm_val": comm_val, 
-                "spr_val": spr_val,
-                "comm_days": comm_days,
-                "total_days": total_days,
-                "fuel_stress_score": fuel_stress
-            }, f)
+        atomic_write.write_json(CACHE_FILE, {
+            "comm_val": comm_val, 
+            "spr_val": spr_val,
+            "comm_days": comm_days,
+            "total_days": total_days,
+            "fuel_stress_score": fuel_stress
+        })
 
     try:
-        feed = feedparser.parse("https://news.google.com/rss/search?q=oil+supply+OR+crude+inventory+when:1d&hl=en-US&gl=US&ceid=US:en")
+        feed = feed_fetcher.parse("https://news.google.com/rss/search?q=oil+supply+OR+crude+inventory+when:1d&hl=en-US&gl=US&ceid=US:en")
         if feed.entries:
             top_headline = feed.entries[0].title
     except Exception:
@@ -96,6 +97,16 @@ def build_fuel_index():
         status, color = "VULNERABLE", "#f59e0b"
     else:
         status, color = "SUPPLY SECURE", "#10b981"
+
+    telemetry.record("fuel", {
+        "comm_val": comm_val,
+        "spr_val": spr_val,
+        "comm_days": comm_days,
+        "spr_days": spr_days,
+        "total_days": total_days,
+        "fuel_stress_score": fuel_stress,
+        "cached": is_cached
+    }, fuel_stress, status)
         
     iea_mandate_pct = min(100, int((total_days / 90) * 100))
 
@@ -104,11 +115,8 @@ def build_fuel_index():
         update_time += " (Cached Data)"
 
     try:
-        with open('templates/fuel_template.html', 'r', encoding='utf-8') as f:
-            template = Template(f.read())
-
         # Note: days_buffer is now tied strictly to comm_days to match the dashboard
-        rendered = template.render(
+        templating.render_page('fuel_template.html', 'fuel-reserves.html',
             days_buffer=comm_days,
             total_days=total_days,
             status_text=status,
@@ -122,9 +130,6 @@ def build_fuel_index():
             last_updated=update_time
         )
         
-        with open('fuel-reserves.html', 'w', encoding='utf-8') as f:
-            f.write(rendered)
-            
         print("Fuel Reserve Countdown Generated successfully.")
     except Exception as e:
         print(f"Template Error: {e}")
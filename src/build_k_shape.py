@@ -1,9 +1,11 @@
-import yfinance as yf
 import pandas as pd
-from jinja2 import Template
+import atomic_write
+import telemetry
+import templating
 import json
 from datetime import datetime
 import pytz
+import price_store
 
 ASSETS = ['SPY', 'VNQ'] 
 ESSENTIALS = ['DBA', 'XLP'] 
@@ -11,8 +13,9 @@ ESSENTIALS = ['DBA', 'XLP']
 def build_k_shape():
     print("CALCULATING MULTI-TIMEFRAME WEALTH FRACTURE...")
     try:
-        # Pull 10 years of data
-        data = yf.download(ASSETS + ESSENTIALS, period="10y")['Close']
+        # 10 years of daily closes from the local price store (only new bars are downloaded)
+        start = pd.Timestamp.now().normalize() - pd.DateOffset(years=10)
+        data = price_store.closes(ASSETS + ESSENTIALS, start)
         data = data.ffill().dropna()
         
         # --- 10-Year Data (Monthly) ---
@@ -48,10 +51,7 @@ def build_k_shape():
 
         update_time = datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%d %b %Y')
 
-        with open('templates/inequality_template.html', 'r', encoding='utf-8') as f:
-            template = Template(f.read())
-
-        rendered = template.render(
+        templating.render_page('inequality_template.html', 'inequality.html',
             fracture_score=round(gap_1y, 1),
             asset_growth=round((asset_perf_1y-1)*100, 1),
             survival_inflation=round((survival_perf_1y-1)*100, 1),
@@ -64,16 +64,13 @@ def build_k_shape():
             survival_1y=json.dumps(chart_survival_1y)
         )
         
-        with open('inequality.html', 'w', encoding='utf-8') as f:
-            f.write(rendered)
-            
         # Export for Orchestrator and Macro Dashboard
         kshape_export = {
             "fracture_score": round(gap_1y, 1), 
             "stress_score": round(stress_score, 1)
         }
-        with open('data/kshape_data.json', 'w') as f: 
-            json.dump(kshape_export, f)
+        atomic_write.write_json('data/kshape_data.json', kshape_export)
+        telemetry.record("k_shape", kshape_export, kshape_export["stress_score"])
             
         print("Success: inequality.html generated.")
 
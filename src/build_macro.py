@@ -1,5 +1,5 @@
 import json
-from jinja2 import Template
+import templating
 
 def main():
     # 1. Load the new Fiat Data from build_fiat.py
@@ -30,10 +30,7 @@ def main():
 
     # 4. Render the HTML
     try:
-        with open('templates/macro_template.html', 'r', encoding='utf-8') as f:
-            template = Template(f.read())
-
-        rendered = template.render(
+        templating.render_page('macro_template.html', 'macro.html',
             us_pos=round(us_pos, 1),
             china_pos=round(china_pos, 1),
             fiat_desc=fiat_data['desc'],
@@ -41,9 +38,6 @@ def main():
             fiat_ratio=fiat_data['ratio']
         )
 
-        with open('macro.html', 'w', encoding='utf-8') as f:
-            f.write(rendered)
-            
         print("✅ Macro Page Generated: macro.html")
     except Exception as e:
         print(f"❌ Template Error: {e}")
@@ -1,16 +1,24 @@
-import yfinance as yf
-import feedparser
-from jinja2 import Template
+import atomic_write
+import telemetry
+import templating
 from datetime import datetime
 import pytz
-import json
+import market_data
+import feed_fetcher
+import headline_scoring
+
+THREAT_KEYWORDS = ['strike', 'missile', 'bomb', 'base', 'retaliation', 'hezbollah', 'houthi', 'lebanon', 'syria', 'iraq', 'saudi', 'yemen', 'idf', 'irgc']
+THREAT_SCORER = headline_scoring.KeywordScorer(THREAT_KEYWORDS)
+
+market_data.register('BZ=F', '1mo')
+market_data.register(['ITA', 'SPY'], '5d')
 
 def build_middle_east_index():
     print("CALCULATING MIDDLE EAST WAR RISK...")
     
     try:
         # 1. Energy Shock Index (Brent Crude)
-        oil = yf.Ticker("BZ=F").history(period="1mo")
+        oil = market_data.history("BZ=F", "1mo")
         current_oil = oil['Close'].iloc[-1]
         avg_oil = oil['Close'].mean()
         oil_spike = ((current_oil - avg_oil) / avg_oil) * 100
@@ -29,8 +37,8 @@ def build_middle_east_index():
 
     try:
         # 2. Defense Sector Premium (War Pricing)
-        ita = yf.Ticker("ITA").history(period="5d")
-        spy = yf.Ticker("SPY").history(period="5d")
+        ita = market_data.history("ITA", "5d")
+        spy = market_data.history("SPY", "5d")
         ita_change = (ita['Close'].iloc[-1] - ita['Open'].iloc[0]) / ita['Open'].iloc[0]
         spy_change = (spy['Close'].iloc[-1] - spy['Open'].iloc[0]) / spy['Open'].iloc[0]
         
@@ -51,18 +59,15 @@ def build_middle_east_index():
         # 3. Regional Contagion OSINT (Expanded Dragnet)
         # GSN Patch: Added Lebanon, Syria, Iraq, Saudi, Yemen
         rss_url = "https://news.google.com/rss/search?q=Iran+OR+Israel+OR+Lebanon+OR+Syria+OR+Saudi+OR+Yemen+OR+Iraq+missile+OR+strike+OR+attack+when:1d&hl=en-US&gl=US&ceid=US:en"
-        feed = feedparser.parse(rss_url)
+        feed = feed_fetcher.parse(rss_url)
         
-        threat_keywords = ['strike', 'missile', 'bomb', 'base', 'retaliation', 'hezbollah', 'houthi', 'lebanon', 'syria', 'iraq', 'saudi', 'yemen', 'idf', 'irgc']
         hit_count = 0
         top_headline = "Awaiting regional OSINT data."
         
         if feed.entries:
             top_headline = feed.entries[0].title
-            for entry in feed.entries[:25]:
-                title = entry.title.lower()
-                if any(k in title for k in threat_keywords):
-                    hit_count += 1
+            titles = [entry.title for entry in feed.entries[:25]]
+            hit_count = int(THREAT_SCORER.hits(titles).any(axis=1).sum())
         
         # 25 hits * 4 = max score of 100
         osint_score = int(max(0, min(100, hit_count * 4)))
@@ -96,10 +101,7 @@ def build_middle_east_index():
     update_time = datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%d %b %Y %H:%M AEST')
 
     try:
-        with open('templates/middle_east_template.html', 'r', encoding='utf-8') as f:
-            template = Template(f.read())
-
-        rendered = template.render(
+        templating.render_page('middle_east_template.html', 'middle-east.html',
             risk_index=master_score,
             status_text=status,
             color_code=color,
@@ -110,16 +112,14 @@ def build_middle_east_index():
             last_updated=update_time
         )
         
-        with open('middle-east.html', 'w', encoding='utf-8') as f:
-            f.write(rendered)
-            
         print(f"✅ Middle East Index Generated: middle-east.html (Score: {master_score})")
         
         me_export = {
             "risk_index": master_score,
             "energy_spike": float(oil_spike)
         }
-        with open('data/me_data.json', 'w') as f: json.dump(me_export, f)
+        atomic_write.write_json('data/me_data.json', me_export)
+        telemetry.record("middle_east", {**me_export, "defense_rotation": defense_score, "gulf_contagion": osint_score}, master_score, status)
 
     except Exception as e:
         print(f"❌ Template Error: {e}")
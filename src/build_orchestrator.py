@@ -1,9 +1,13 @@
 import json
 import os
-import time
 from datetime import datetime
 import pytz
-from google import genai
+from build_snapshot import build_snapshot
+import alert_rules
+import atomic_write
+import llm_client
+import synthesis_cache
+import telemetry
 
 # ==============================
 # GSN Configuration
@@ -11,7 +15,7 @@ from google import genai
 API_KEY = os.environ.get("GEMINI_API_KEY")
 print("GSN TERMINAL: Gemini key verification:", bool(API_KEY))
 
-client = genai.Client(api_key=API_KEY) if API_KEY else None
+LLM = llm_client.LLMClient(api_key=API_KEY)
 
 DATA_FILES = {
     "taiwan": "data/taiwan_data.json",
@@ -22,9 +26,22 @@ DATA_FILES = {
     "inequality": "data/kshape_data.json",
 }
 
+# telemetry node -> DATA_FILES key of its legacy export
+NODE_FILES = {
+    "taiwan": "taiwan",
+    "ai_bubble": "ai_bubble",
+    "fuel": "fuel",
+    "middle_east": "middle_east",
+    "supply": "supply",
+    "k_shape": "inequality",
+}
+
 ALERTS_OUTPUT_FILE = "data/active_alerts.json"
 BRIEFING_OUTPUT_FILE = "data/agentic_briefing.json"
 
+SYNTHESIS_CACHE = synthesis_cache.SynthesisCache()
+ALERT_ENGINE = alert_rules.AlertEngine(alert_rules.load_rules())
+
 # ==============================
 # Utility Functions
 # ==============================
@@ -41,10 +58,39 @@ def load_json(filepath):
 # ==============================
 # Gemini Agentic Synthesis
 # ==============================
+def parse_briefing(raw_text):
+    """Read the model reply: JSON first, then the legacy KEY: value lines."""
+    briefing = {
+        "risk_score": 5,
+        "executive_summary": "Synthesis failed to parse.",
+        "correlations": "No correlations identified."
+    }
+    text = raw_text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(text)
+        briefing["risk_score"] = int(data.get("risk_score", briefing["risk_score"]))
+        briefing["executive_summary"] = str(data.get("summary", briefing["executive_summary"])).strip()
+        briefing["correlations"] = str(data.get("correlations", briefing["correlations"])).strip()
+        return briefing
+    except (ValueError, TypeError, AttributeError):
+        pass
+
+    for line in text.split('\n'):
+        if line.startswith("RISK_SCORE:"):
+            briefing["risk_score"] = int(''.join(filter(str.isdigit, line)))
+        elif line.startswith("SUMMARY:"):
+            briefing["executive_summary"] = line.replace("SUMMARY:", "").strip()
+        elif line.startswith("CORRELATIONS:"):
+            briefing["correlations"] = line.replace("CORRELATIONS:", "").strip()
+    return briefing
+
+
 def generate_agentic_briefing(metrics):
     print("GSN TERMINAL: Initialising Agentic Synthesis...")
 
-    if not client:
+    if not LLM.available:
         print("GSN TERMINAL: WARNING - API Key absent. Synthesis suspended.")
         return {
             "risk_score": 5,
@@ -52,6 +98,13 @@ def generate_agentic_briefing(metrics):
             "correlations": "None - Pipeline Offline."
         }
 
+    # Unchanged telemetry (to PRECISION) reuses the last briefing without a call.
+    cache_key = synthesis_cache.metrics_key(metrics)
+    cached = SYNTHESIS_CACHE.get(cache_key)
+    if cached:
+        print("GSN TERMINAL: Telemetry unchanged. Reusing cached synthesis.")
+        return cached
+
     prompt = f"""
     You are the central intelligence node of the Global Shift Network.
     Review the following live telemetry. Identify critical cross-correlations.
@@ -65,40 +118,20 @@ def generate_agentic_briefing(metrics):
     - Wealth Inequality Fracture Gap: {metrics['kshape_raw_gap']}% (Stress: {metrics['kshape_stress']}/100)
 
     Response Requirements (Strictly follow this format):
-    RISK_SCORE: [1-10 integer]
-    SUMMARY: [Clinical, analytical 2-3 sentence executive briefing. Australian English. No dashes.]
-    CORRELATIONS: [Brief note on systemic linkage between two metrics. No dashes.]
+    Reply with a single JSON object with these keys and nothing else:
+    "risk_score": [1-10 integer]
+    "summary": [Clinical, analytical 2-3 sentence executive briefing. Australian English. No dashes.]
+    "correlations": [Brief note on systemic linkage between two metrics. No dashes.]
     """
 
-    # Rate Limit Mitigation: Pause execution to clear the upstream Per-Minute API pipeline window
-    time.sleep(5)
-
+    # Rate limiting, retries and the prompt cache live in llm_client
     try:
-        response = client.models.generate_content(
-            model="gemini-3.5-flash",
-            contents=prompt,
-        )
-
-        raw_text = response.text.strip()
-        
-        lines = raw_text.split('\n')
-        score = 5
-        summary = "Synthesis failed to parse."
-        correlations = "No correlations identified."
-
-        for line in lines:
-            if line.startswith("RISK_SCORE:"):
-                score = int(''.join(filter(str.isdigit, line)))
-            elif line.startswith("SUMMARY:"):
-                summary = line.replace("SUMMARY:", "").strip()
-            elif line.startswith("CORRELATIONS:"):
-                correlations = line.replace("CORRELATIONS:", "").strip()
+        reply = LLM.generate(prompt, config={"response_mime_type": "application/json"})
 
-        return {
-            "risk_score": score,
-            "executive_summary": summary,
-            "correlations": correlations
-        }
+        briefing = parse_briefing(reply)
+        if briefing["executive_summary"] != "Synthesis failed to parse.":
+            SYNTHESIS_CACHE.put(cache_key, briefing)
+        return briefing
 
     except Exception as e:
         print(f"GSN TERMINAL: ERROR - Gemini synthesis failed: {e}")
@@ -113,26 +146,17 @@ def generate_agentic_briefing(metrics):
 # ==============================
 def run_orchestrator():
     print("GSN TERMINAL: Initialising Agentic Master Orchestrator...")
-    active_alerts = []
-
-    tw_data = load_json(DATA_FILES["taiwan"]) or {}
-    ai_data = load_json(DATA_FILES["ai_bubble"]) or {}
-    fuel_data = load_json(DATA_FILES["fuel"]) or {}
-    me_data = load_json(DATA_FILES["middle_east"]) or {}
-    supply_data = load_json(DATA_FILES["supply"]) or {}
-    kshape_data = load_json(DATA_FILES["inequality"]) or {}
-
-    metrics = {
-        "tw_media_panic": tw_data.get("media_noise", 30),
-        "tw_physical_change": tw_data.get("daily_change", 0),
-        "ai_score": ai_data.get("bubble_index", 50),
-        "fuel_days": fuel_data.get("comm_days", 35.0), 
-        "fuel_stress": fuel_data.get("fuel_stress_score", 0.0),
-        "me_energy_spike": me_data.get("energy_spike", 0.0),
-        "supply_score": supply_data.get("stress_score", 50),
-        "kshape_raw_gap": kshape_data.get("fracture_score", 0.0),
-        "kshape_stress": kshape_data.get("stress_score", 0.0),
-    }
+
+    # One indexed query for every node's latest reading; a node without
+    # metrics in the store (legacy CSV rows only) falls back to its export.
+    readings = telemetry.latest()
+
+    def node_metrics(node):
+        if readings.get(node, {}).get("metrics"):
+            return readings[node]["metrics"]
+        return load_json(DATA_FILES[NODE_FILES[node]]) or {}
+
+    metrics = alert_rules.metrics_from({node: node_metrics(node) for node in NODE_FILES})
 
     intelligence = generate_agentic_briefing(metrics)
 
@@ -146,42 +170,11 @@ def run_orchestrator():
         "correlations": intelligence["correlations"]
     }
 
-    with open(BRIEFING_OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(briefing_payload, f, indent=4)
+    atomic_write.write_json(BRIEFING_OUTPUT_FILE, briefing_payload, volatile=("timestamp",), indent=4)
 
     print("GSN TERMINAL: Agentic briefing saved with status LIVE_INTELLIGENCE.")
 
-    if metrics["tw_media_panic"] >= 80 and abs(metrics["tw_physical_change"]) <= 2:
-        active_alerts.append({
-            "type": "DIVERGENCE",
-            "severity": "ELEVATED",
-            "headline": "Taiwan Strait: Media hysteria diverging from physical supply data.",
-            "link": "taiwan.html",
-        })
-
-    if 0 < metrics["fuel_days"] < 25:
-        active_alerts.append({
-            "type": "CREEPING BASELINE",
-            "severity": "CRITICAL",
-            "headline": f"Global Fuel Reserves Vulnerable: Commercial Buffer at {metrics['fuel_days']} Days.",
-            "link": "fuel-reserves.html",
-        })
-
-    if metrics["supply_score"] > 65 and metrics["me_energy_spike"] > 5.0:
-        active_alerts.append({
-            "type": "CROSS-CORRELATION",
-            "severity": "SEVERE",
-            "headline": "Systemic Shock: Energy sector volatility compounding global shipping bottlenecks.",
-            "link": "supply-chain.html",
-        })
-
-    if metrics["kshape_stress"] > 75.0:
-        active_alerts.append({
-            "type": "SYSTEMIC FRACTURE",
-            "severity": "SEVERE",
-            "headline": f"Wealth Compression: Cost of survival outpacing asset growth by {metrics['kshape_raw_gap']}%.",
-            "link": "inequality.html",
-        })
+    active_alerts = ALERT_ENGINE.alerts(metrics)
 
     display_time = datetime.now(pytz.timezone("Australia/Brisbane")).strftime("%d %b %Y %H:%M AEST")
     
@@ -191,10 +184,13 @@ def run_orchestrator():
         "alerts": active_alerts,
     }
 
-    with open(ALERTS_OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=4)
+    atomic_write.write_json(ALERTS_OUTPUT_FILE, output_data, volatile=("last_updated",), indent=4)
 
     print(f"GSN TERMINAL: Orchestrator Complete. {len(active_alerts)} systemic anomalies identified.")
+    print(f"GSN TERMINAL: {LLM.report()}")
+
+    # Re-bundle so the terminal snapshot carries the new briefing and alerts.
+    build_snapshot()
 
 if __name__ == "__main__":
     run_orchestrator()
\ No newline at end of file
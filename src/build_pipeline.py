@@ -0,0 +1,191 @@
+import argparse
+import importlib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# GSN Terminal: Deterministic Sub-Node Pipeline
+# Runs every build_* node as a dependency DAG. Each node declares the files it
+# reads and writes; a node starts as soon as every node producing one of its
+# inputs has finished, so independent network-bound nodes overlap.
+
+# ==========================================
+# NODE REGISTRY
+# ==========================================
+# entry:   (module in src/, callable)
+# inputs:  files read from a previous node (self-produced files are ignored)
+# outputs: files written by the node
+NODES = {
+    "fiat": {
+        "entry": ("build_fiat", "build_fiat_confidence"),
+        "inputs": [],
+        "outputs": ["data/fiat_data.json", "fiat.html"],
+    },
+    "fuel": {
+        "entry": ("build_fuel", "build_fuel_index"),
+        "inputs": ["data/fuel_cache.json"],
+        "outputs": ["data/fuel_cache.json", "fuel-reserves.html"],
+    },
+    "k_shape": {
+        "entry": ("build_k_shape", "build_k_shape"),
+        "inputs": [],
+        "outputs": ["data/kshape_data.json", "inequality.html"],
+    },
+    "middle_east": {
+        "entry": ("build_middle_east", "build_middle_east_index"),
+        "inputs": [],
+        "outputs": ["data/me_data.json", "middle-east.html"],
+    },
+    "supply": {
+        "entry": ("build_supply", "build_supply_chain"),
+        "inputs": [],
+        "outputs": ["data/supply_data.json", "supply-chain.html"],
+    },
+    "ai": {
+        "entry": ("build_ai", "build_index"),
+        "inputs": ["data/fuel_cache.json", "data/supply_data.json"],
+        "outputs": ["data/ai_disruption_data.json", "ai-disruption.html"],
+    },
+    "taiwan": {
+        "entry": ("build", "main"),
+        "inputs": ["data/taiwan_history.db"],
+        "outputs": ["data/taiwan_history.db", "data/history.json", "data/taiwan_data.json", "taiwan.html"],
+    },
+    "macro": {
+        "entry": ("build_macro", "main"),
+        "inputs": ["data/fiat_data.json", "data/history.json"],
+        "outputs": ["macro.html"],
+    },
+    "snapshot": {
+        "entry": ("build_snapshot", "build_snapshot"),
+        "inputs": [
+            "data/ai_disruption_data.json", "data/fuel_cache.json", "data/kshape_data.json",
+            "data/me_data.json", "data/supply_data.json", "data/taiwan_data.json",
+        ],
+        "outputs": ["data/terminal_snapshot.json"],
+    },
+    "sitemap": {
+        "entry": ("build_sitemap", "generate_sitemap"),
+        "inputs": [
+            "fiat.html", "fuel-reserves.html", "inequality.html", "middle-east.html",
+            "supply-chain.html", "ai-disruption.html", "taiwan.html", "macro.html",
+        ],
+        "outputs": ["sitemap.xml"],
+    },
+}
+
+
+def resolve_dependencies(nodes):
+    """Map each node to the set of nodes producing its inputs."""
+    producers = {}
+    for name, spec in nodes.items():
+        for path in spec["outputs"]:
+            producers.setdefault(path, set()).add(name)
+
+    deps = {}
+    for name, spec in nodes.items():
+        deps[name] = set()
+        for path in spec["inputs"]:
+            deps[name] |= producers.get(path, set()) - {name}
+    return deps
+
+
+def topological_order(deps):
+    """Kahn ordering of the DAG. Raises ValueError on a dependency cycle."""
+    remaining = {name: set(d) for name, d in deps.items()}
+    order = []
+    while remaining:
+        ready = sorted(name for name, d in remaining.items() if not d)
+        if not ready:
+            raise ValueError(f"Dependency cycle between nodes: {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for d in remaining.values():
+            d.difference_update(ready)
+    return order
+
+
+def run_node(name):
+    module_name, func_name = NODES[name]["entry"]
+    module = importlib.import_module(module_name)
+    start = time.perf_counter()
+    getattr(module, func_name)()
+    return time.perf_counter() - start
+
+
+def run_pipeline(selected=None, max_workers=6):
+    deps = resolve_dependencies(NODES)
+    topological_order(deps)
+
+    if selected:
+        deps = {name: deps[name] & set(selected) for name in selected}
+
+    # Import every node before the first one runs so each registers its
+    # tickers with market_data and shares one bulk download per period.
+    for name in deps:
+        try:
+            importlib.import_module(NODES[name]["entry"][0])
+        except Exception as e:
+            print(f"⚠️ Node import failed: {name}: {e}")
+
+    pending = {name: set(d) for name, d in deps.items()}
+    running = {}
+    timings = {}
+    failed = []
+    wall_start = time.perf_counter()
+
+    print(f"GSN TERMINAL: Launching {len(pending)} sub-nodes on {max_workers} workers...")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name in sorted(n for n, d in pending.items() if not d):
+                del pending[name]
+                print(f"▶️ Node started: {name}")
+                running[pool.submit(run_node, name)] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    timings[name] = future.result()
+                    print(f"✅ Node complete: {name} ({timings[name]:.1f}s)")
+                except Exception as e:
+                    # Downstream nodes still run: every node already falls back
+                    # to cached or baseline data when an input is stale.
+                    failed.append(name)
+                    print(f"❌ Node failed: {name}: {e}")
+                for d in pending.values():
+                    d.discard(name)
+
+    wall = time.perf_counter() - wall_start
+    serial = sum(timings.values())
+    print(f"GSN TERMINAL: Pipeline complete in {wall:.1f}s (serial node time {serial:.1f}s).")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the GSN build nodes as a dependency DAG.")
+    parser.add_argument("nodes", nargs="*", help="Subset of nodes to run (default: all).")
+    parser.add_argument("--workers", type=int, default=6, help="Thread pool size.")
+    parser.add_argument("--plan", action="store_true", help="Print the execution order and exit.")
+    args = parser.parse_args()
+
+    unknown = [n for n in args.nodes if n not in NODES]
+    if unknown:
+        parser.error(f"Unknown nodes: {', '.join(unknown)}")
+
+    if args.plan:
+        deps = resolve_dependencies(NODES)
+        for name in topological_order(deps):
+            after = ", ".join(sorted(deps[name])) or "-"
+            print(f"{name:<12} after: {after}")
+        return
+
+    failed = run_pipeline(args.nodes or None, max_workers=args.workers)
+    if failed:
+        print(f"GSN TERMINAL: {len(failed)} node(s) failed: {', '.join(sorted(failed))}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
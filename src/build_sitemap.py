@@ -1,5 +1,6 @@
 import os
 from datetime import datetime
+import atomic_write
 
 # GSN Terminal: Sitemap Generator Calibration
 # Target: Technical SEO Optimisation & Full Directory Coverage
@@ -22,8 +23,8 @@ def generate_sitemap():
             if "template" in file or file == "index.html" or file == "test.html":
                 continue
                 
-            # Calculate dynamic last modified time
-            mod_time = datetime.fromtimestamp(os.path.getmtime(file)).strftime("%Y-%m-%d")
+            # Last content change (recorded by atomic_write), not the checkout mtime
+            mod_time = atomic_write.last_changed(file)
             
             pages.append({
                 "loc": f"{BASE_URL}/{file}", 
@@ -45,7 +46,7 @@ def generate_sitemap():
         for file in os.listdir(ARTICLES_DIR):
             if file.endswith(".html"):
                 file_path = os.path.join(ARTICLES_DIR, file)
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path)).strftime("%Y-%m-%d")
+                mod_time = atomic_write.last_changed(file_path)
                 
                 pages.append({
                     "loc": f"{BASE_URL}/{ARTICLES_DIR}/{file}", 
@@ -59,7 +60,7 @@ def generate_sitemap():
         for file in os.listdir(PUBLIC_DIR):
             if file.endswith(".html"):
                 file_path = os.path.join(PUBLIC_DIR, file)
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path)).strftime("%Y-%m-%d")
+                mod_time = atomic_write.last_changed(file_path)
                 
                 pages.append({
                     "loc": f"{BASE_URL}/{PUBLIC_DIR}/{file}", 
@@ -84,9 +85,8 @@ def generate_sitemap():
 
     sitemap_content += "</urlset>"
 
-    # Execute strict UTF-8 write protocol
-    with open("sitemap.xml", "w", encoding="utf-8") as f:
-        f.write(sitemap_content)
+    # Execute strict UTF-8 write protocol (skipped when nothing changed)
+    atomic_write.write_text("sitemap.xml", sitemap_content)
     
     print(f"GSN TERMINAL: Sitemap recalibrated. {len(pages)} nodes indexed.")
 
@@ -0,0 +1,76 @@
+import gzip
+import json
+from datetime import datetime, timezone
+import atomic_write
+
+# GSN Terminal: Terminal Snapshot Bundler
+# Merges every node export the terminal page reads into one versioned file,
+# so index.html makes a single request and sees one consistent run instead of
+# eight files that may have been written by different builds. Precompressed
+# .gz/.br siblings are written next to it for hosts that serve them directly.
+
+SNAPSHOT_FILE = "data/terminal_snapshot.json"
+SCHEMA_VERSION = 1
+
+# snapshot key -> node export
+SNAPSHOT_SOURCES = {
+    "active_alerts": "data/active_alerts.json",
+    "agentic_briefing": "data/agentic_briefing.json",
+    "ai_disruption": "data/ai_disruption_data.json",
+    "fuel": "data/fuel_cache.json",
+    "kshape": "data/kshape_data.json",
+    "middle_east": "data/me_data.json",
+    "supply": "data/supply_data.json",
+    "taiwan": "data/taiwan_data.json",
+}
+
+
+def load_sources(sources=SNAPSHOT_SOURCES):
+    """Read each export; a missing or corrupt file becomes None rather than failing the bundle."""
+    sections = {}
+    for key, path in sources.items():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                sections[key] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"⚠️ Snapshot source unavailable: {path} ({e})")
+            sections[key] = None
+    return sections
+
+
+def write_compressed(path, payload):
+    """Write the .gz/.br siblings of path, each only if its content changed."""
+    # mtime=0 keeps the .gz byte-identical when the snapshot has not changed.
+    atomic_write.write_bytes(path + '.gz', gzip.compress(payload, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        print("⚠️ brotli not installed; skipping .br snapshot.")
+        return
+    atomic_write.write_bytes(path + '.br', brotli.compress(payload, quality=11))
+
+
+def build_snapshot(output_file=SNAPSHOT_FILE):
+    snapshot = {
+        "schema_version": SCHEMA_VERSION,
+        "generated_at": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        **load_sources(),
+    }
+    text = json.dumps(snapshot, separators=(',', ':'), ensure_ascii=False)
+    stable = json.dumps({k: v for k, v in snapshot.items() if k != "generated_at"}, sort_keys=True)
+
+    present = sum(1 for key in SNAPSHOT_SOURCES if snapshot[key] is not None)
+    written = atomic_write.write_text(output_file, text, stable)
+    # The siblings always mirror the file on disk (kept or new); a missing one is regenerated.
+    with open(output_file, 'rb') as f:
+        payload = f.read()
+    write_compressed(output_file, payload)
+    if not written:
+        print(f"✅ Terminal Snapshot Unchanged: {output_file} ({present}/{len(SNAPSHOT_SOURCES)} sources)")
+    else:
+        print(f"✅ Terminal Snapshot Generated: {output_file} ({present}/{len(SNAPSHOT_SOURCES)} sources, {len(payload)} bytes)")
+    return snapshot
+
+
+if __name__ == "__main__":
+    build_snapshot()
@@ -1,13 +1,17 @@
-import yfinance as yf
-from jinja2 import Template
+import atomic_write
+import telemetry
+import templating
 from datetime import datetime
 import pytz
-import json
+import market_data
+
+SUPPLY_BASKET = ['BDRY', 'USO']
+market_data.register(SUPPLY_BASKET, '3mo')
 
 def build_supply_chain():
     print("CALCULATING SUPPLY CHAIN STRESS...")
     try:
-        data = yf.download(['BDRY', 'USO'], period="3mo")['Close']
+        data = market_data.closes(SUPPLY_BASKET, "3mo")
         normalized = data / data.iloc[0]
         
         shipping_stress = (normalized['BDRY'].iloc[-1] - 1) * 100
@@ -18,10 +22,7 @@ def build_supply_chain():
         update_time = datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%d %b %Y')
 
         # Jinja2 Rendering
-        with open('templates/supply_template.html', 'r', encoding='utf-8') as f:
-            template = Template(f.read())
-
-        rendered = template.render(
+        templating.render_page('supply_template.html', 'supply-chain.html',
             stress_score=score,
             status_text=status,
             shipping_stress=round(shipping_stress, 1),
@@ -29,9 +30,6 @@ def build_supply_chain():
             last_updated=update_time
         )
         
-        with open('supply-chain.html', 'w', encoding='utf-8') as f:
-            f.write(rendered)
-            
         print(f"Success: supply-chain.html generated.")
         
         # --- EXPORT FOR ORCHESTRATOR (Now correctly inside the Try block) ---
@@ -40,7 +38,8 @@ def build_supply_chain():
             "shipping_stress": float(shipping_stress),
             "energy_stress": float(energy_stress)
         }
-        with open('data/supply_data.json', 'w') as f: json.dump(supply_export, f)
+        atomic_write.write_json('data/supply_data.json', supply_export)
+        telemetry.record("supply", supply_export, score, status)
 
     except Exception as e:
         print(f"Error: {e}")
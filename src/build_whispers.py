@@ -1,9 +1,7 @@
-import feedparser
-import json
-import os
 import re
 import html
-from datetime import datetime
+import feed_fetcher
+import whisper_ledger
 
 # ==========================================
 # GSN CONTEXT NODES (KOL ROSTER)
@@ -30,70 +28,41 @@ def clean_html(raw_html, title):
 def fetch_whispers():
     print("GSN TERMINAL: Initiating Deep Context Node Scraping...")
     
-    ledger_path = 'data/whisper_ledger.json'
-    os.makedirs('data', exist_ok=True)
-    
-    # 1. Load the existing memory bank (or start a new one)
-    if os.path.exists(ledger_path):
-        try:
-            with open(ledger_path, 'r', encoding='utf-8') as f:
-                ledger = json.load(f)
-        except Exception:
-            ledger = {"whispers": []}
-    else:
-        ledger = {"whispers": []}
-        
-    # Get a list of titles we already have so we don't duplicate them
-    existing_titles = [w['title'] for w in ledger.get('whispers', [])]
+    # 1. Open the memory bank (de-duplication is enforced by the ledger index)
+    ledger = whisper_ledger.open_ledger()
     new_count = 0
     
-    for author, url in FEEDS.items():
-        try:
-            print(f"📡 Intercepting {author}...")
-            feed = feedparser.parse(url)
-            
-            if feed.entries:
-                # Scan the top 3 most recent entries instead of just the first one
-                for latest in feed.entries[:3]:
-                    title = latest.get('title', 'No Title')
-                    
-                    # Check for duplicates
-                    if title in existing_titles:
-                        print(f"   ⏭️ Already logged: {title}")
-                        continue
-                    
-                    if 'content' in latest:
-                        raw_text = latest.content[0].value
-                    else:
-                        raw_text = latest.get('summary', '') or latest.get('description', '')
-                    
-                    summary_clean = clean_html(raw_text, title)
-                    
-                    # Add new intelligence to the ledger
-                    ledger['whispers'].append({
-                        "author": author,
-                        "title": title,
-                        "snippet": summary_clean,
-                        "status": "UNPUBLISHED",
-                        "date_added": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
-                    
-                    # Add to existing_titles to prevent duplicates within the same run
-                    existing_titles.append(title)
-                    new_count += 1
-                    print(f"   ✅ Secured New Intel: {title}")
-            else:
-                print(f"⚠️ No entries found for {author}.")
+    print(f"📡 Intercepting {len(FEEDS)} context nodes...")
+    feeds = feed_fetcher.fetch_feeds(FEEDS)
+
+    for author in FEEDS:
+        feed = feeds.get(author)
+        if feed is None:
+            continue
+
+        if feed.entries:
+            # Scan the top 3 most recent entries instead of just the first one
+            for latest in feed.entries[:3]:
+                title = latest.get('title', 'No Title')
+                
+                if 'content' in latest:
+                    raw_text = latest.content[0].value
+                else:
+                    raw_text = latest.get('summary', '') or latest.get('description', '')
+                
+                summary_clean = clean_html(raw_text, title)
+                
+                # Add new intelligence to the ledger, skipping duplicates
+                if not whisper_ledger.add_if_new(ledger, author, title, summary_clean):
+                    print(f"   ⏭️ Already logged: {title}")
+                    continue
                 
-        except Exception as e:
-            print(f"❌ Target offline - {author}: {e}")
+                new_count += 1
+                print(f"   ✅ Secured New Intel: {title}")
+        else:
+            print(f"⚠️ No entries found for {author}.")
             
-    # ==========================================
-    # SAVE THE LEDGER
-    # ==========================================
-    with open(ledger_path, 'w', encoding='utf-8') as f:
-        json.dump(ledger, f, indent=4)
-        
+    ledger.close()
     print(f"GSN TERMINAL: System memory updated. Added {new_count} new context nodes.")
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+import hashlib
+import json
+import os
+import atomic_write
+
+# GSN Terminal: Card Cache
+# Content-addressed index of rendered cards. The key is a hash of everything
+# that ends up on the card (plus the backend that drew it), so a rerun with
+# unchanged inputs reuses the committed PNG instead of launching a renderer
+# and writing a new, byte-different copy into public/.
+
+CARD_INDEX = "data/card_index.json"
+CARD_DIR = "public"
+
+# Bump when the card layout changes so stale renders are not reused.
+CARD_VERSION = 1
+
+
+def card_key(card_args, date_str, backend):
+    payload = json.dumps([CARD_VERSION, backend, date_str, *card_args], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _load_index():
+    try:
+        with open(CARD_INDEX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def lookup(key):
+    """Filename of a cached render for key, or None if it is missing on disk."""
+    filename = _load_index().get(key)
+    if filename and os.path.exists(os.path.join(CARD_DIR, filename)):
+        return filename
+    return None
+
+
+def record(key, filename):
+    # Drop entries whose file was removed or is about to be overwritten.
+    index = {k: v for k, v in _load_index().items()
+             if v != filename and os.path.exists(os.path.join(CARD_DIR, v))}
+    index[key] = filename
+    atomic_write.write_json(CARD_INDEX, index, indent=2, sort_keys=True)
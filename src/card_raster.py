@@ -0,0 +1,196 @@
+import os
+from datetime import datetime
+
+# GSN Terminal: Raster Card Renderer
+# Draws the build.generate_dark_mode_card layout directly with Pillow, so a
+# card takes milliseconds and needs no browser. Geometry mirrors the CSS in
+# generate_dark_mode_card; keep the two in step when either changes.
+
+CARD_SIZE = (1200, 628)
+CONTAINER = (48, 37, 1152, 591)     # 1100x550 content box + 2px border, centred
+BORDER = 2
+PANEL_PADDING = 50
+GRID_STEP = 40
+
+BG = "#0f172a"
+PANEL_BG = "#1e293b"
+LINE = "#334155"
+LABEL = "#94a3b8"
+MUTED = "#64748b"
+VALUE = "#f8fafc"
+FOOTER = "#475569"
+
+FONT_DIRS = [
+    "public/fonts",
+    "/usr/share/fonts/truetype/jetbrains-mono",
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/TTF",
+    "/Library/Fonts",
+    "C:/Windows/Fonts",
+]
+FONT_FILES = {
+    "regular": ["JetBrainsMono-Regular.ttf", "DejaVuSansMono.ttf"],
+    "bold": ["JetBrainsMono-Bold.ttf", "DejaVuSansMono-Bold.ttf"],
+    "extrabold": ["JetBrainsMono-ExtraBold.ttf", "JetBrainsMono-Bold.ttf", "DejaVuSansMono-Bold.ttf"],
+}
+
+_FONT_CACHE = {}
+
+
+def _rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _blend(fg, bg, alpha):
+    fg, bg = _rgb(fg), _rgb(bg)
+    return tuple(round(f * alpha + b * (1 - alpha)) for f, b in zip(fg, bg))
+
+
+def _font(weight, size):
+    from PIL import ImageFont
+
+    key = (weight, size)
+    if key not in _FONT_CACHE:
+        for name in FONT_FILES[weight]:
+            for folder in FONT_DIRS:
+                path = os.path.join(folder, name)
+                if os.path.exists(path):
+                    _FONT_CACHE[key] = ImageFont.truetype(path, size)
+                    break
+            if key in _FONT_CACHE:
+                break
+        else:
+            _FONT_CACHE[key] = ImageFont.load_default(size=size)
+    return _FONT_CACHE[key]
+
+
+def _text_width(font, text, spacing):
+    return sum(font.getlength(ch) + spacing for ch in text)
+
+
+def _draw_text(draw, x, baseline, text, font, fill, spacing=0):
+    """Draw text on a baseline with CSS-style letter-spacing after every glyph."""
+    if not spacing:
+        draw.text((x, baseline), text, font=font, fill=fill, anchor='ls')
+        return
+    for ch in text:
+        draw.text((x, baseline), ch, font=font, fill=fill, anchor='ls')
+        x += font.getlength(ch) + spacing
+
+
+def _line_box(font, line_height=None):
+    """(height, baseline offset) of one CSS line box for this font."""
+    ascent, descent = font.getmetrics()
+    height = line_height if line_height is not None else ascent + descent
+    return height, (height - (ascent + descent)) / 2 + ascent
+
+
+def _wrap(font, text, width):
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if current and font.getlength(candidate) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    return lines + [current] if current else lines
+
+
+def render_card(score, status, color, market_desc, conflict_phrase, trend_arrow, output_file, date_str=None):
+    """Draw the situation room card to output_file (PNG) and return the path."""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
+    image = Image.new("RGB", CARD_SIZE, BG)
+    draw = ImageDraw.Draw(image)
+
+    # --- Container, grid and panel divider ---
+    x0, y0, x1, y1 = CONTAINER
+    draw.rounded_rectangle(CONTAINER, radius=16, fill=PANEL_BG, outline=LINE, width=BORDER)
+    grid = _blend(LINE, PANEL_BG, 0.1)
+    ix0, iy0, ix1, iy1 = x0 + BORDER, y0 + BORDER, x1 - BORDER, y1 - BORDER
+    for gx in range(ix0, ix1, GRID_STEP):
+        draw.line([(gx, iy0 + 1), (gx, iy1 - 1)], fill=grid)
+    for gy in range(iy0, iy1, GRID_STEP):
+        draw.line([(ix0 + 1, gy), (ix1 - 1, gy)], fill=grid)
+
+    column = (ix1 - ix0) // 2
+    draw.rectangle([ix0 + column - BORDER, iy0, ix0 + column - 1, iy1 - 1], fill=LINE)
+    panel_height = iy1 - iy0
+
+    # --- Left panel: label, score + trend, status badge ---
+    label_font = _font("regular", 20)
+    score_font = _font("extrabold", 160)
+    trend_font = _font("regular", 80)
+    badge_font = _font("bold", 32)
+
+    label_h, label_base = _line_box(label_font)
+    badge_text_h, badge_base = _line_box(badge_font)
+    badge_h = badge_text_h + 20 + 2
+    block_h = label_h + 10 + 160 + 20 + badge_h
+    left_x = ix0 + PANEL_PADDING
+    top = iy0 + (panel_height - block_h) / 2
+
+    _draw_text(draw, left_x, top + label_base, "TAIWAN STRAIT RISK INDEX", label_font, LABEL, spacing=2)
+
+    score_top = top + label_h + 10
+    score_text = str(score)
+    score_w = score_font.getlength(score_text)
+    _, score_base = _line_box(score_font, line_height=160)
+
+    # text-shadow: 0 0 40px — blur only the region around the digits
+    pad = 60
+    glow_box = (int(left_x - pad), int(score_top - pad), int(left_x + score_w + pad), int(score_top + 160 + pad))
+    glow = Image.new("RGBA", (glow_box[2] - glow_box[0], glow_box[3] - glow_box[1]), (0, 0, 0, 0))
+    ImageDraw.Draw(glow).text((pad, pad + score_base), score_text, font=score_font,
+                              fill=_rgb(color) + (0x40,), anchor='ls')
+    glow = glow.filter(ImageFilter.GaussianBlur(20))
+    image.paste(glow, glow_box[:2], glow)
+    draw = ImageDraw.Draw(image)
+    _draw_text(draw, left_x, score_top + score_base, score_text, score_font, color)
+
+    trend_h, trend_base = _line_box(trend_font)
+    trend_top = score_top + (160 - trend_h) / 2
+    _draw_text(draw, left_x + score_w + 20, trend_top + trend_base, trend_arrow, trend_font, MUTED)
+
+    badge_top = score_top + 160 + 20
+    badge_label = status.upper()
+    badge_w = _text_width(badge_font, badge_label, 3) + 48 + 2
+    draw.rounded_rectangle([left_x, badge_top, left_x + badge_w, badge_top + badge_h], radius=8,
+                           fill=_blend(color, PANEL_BG, 0x20 / 255), outline=color, width=1)
+    _draw_text(draw, left_x + 1 + 24, badge_top + 1 + 10 + badge_base, badge_label, badge_font, color, spacing=3)
+
+    # --- Right panel: intel rows ---
+    row_label_font = _font("regular", 18)
+    row_value_font = _font("bold", 28)
+    row_label_h, row_label_base = _line_box(row_label_font)
+    row_value_h, row_value_base = _line_box(row_value_font)
+    right_x = ix0 + column + PANEL_PADDING
+    value_width = (ix1 - right_x) - PANEL_PADDING - 4 - 15
+
+    rows = [("CONFLICT SIGNALS", conflict_phrase), ("MARKET SENTIMENT", market_desc), ("DATE", date_str)]
+    wrapped = [(label, _wrap(row_value_font, str(value), value_width)) for label, value in rows]
+    rows_h = sum(row_label_h + 8 + row_value_h * max(1, len(lines)) + 40 for _, lines in wrapped)
+    y = iy0 + (panel_height - rows_h) / 2
+
+    for label, lines in wrapped:
+        _draw_text(draw, right_x, y + row_label_base, label, row_label_font, MUTED)
+        y += row_label_h + 8
+        value_h = row_value_h * max(1, len(lines))
+        draw.rectangle([right_x, y, right_x + 3, y + value_h - 1], fill=color)
+        for i, line in enumerate(lines):
+            _draw_text(draw, right_x + 4 + 15, y + i * row_value_h + row_value_base, line, row_value_font, VALUE)
+        y += value_h + 40
+
+    # --- Footer ---
+    footer_font = _font("regular", 16)
+    footer_text = "TAIWANSTRAITTRACKER.COM // OSINT AUTOMATION"
+    footer_h, footer_base = _line_box(footer_font)
+    footer_w = _text_width(footer_font, footer_text, 1)
+    _draw_text(draw, ix1 - 30 - footer_w, iy1 - 20 - footer_h + footer_base, footer_text, footer_font, FOOTER, spacing=1)
+
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    image.save(output_file)
+    return output_file
@@ -0,0 +1,168 @@
+import base64
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+# GSN Terminal: Card Renderer Service
+# Keeps one headless Chrome alive over the DevTools protocol and screenshots a
+# batch of HTML cards in that session, so only the first card pays for the
+# browser start-up that Html2Image repeats on every screenshot.
+
+CARD_SIZE = (1200, 628)
+CHROME_FLAGS = ['--no-sandbox', '--disable-gpu', '--hide-scrollbars']
+STARTUP_TIMEOUT = 20
+RENDER_TIMEOUT = 30
+
+
+class CardRenderer:
+    """Headless Chrome session for rendering HTML cards to PNG.
+
+    Use as a context manager:
+
+        with CardRenderer() as renderer:
+            renderer.render_many([(html, 'public/card.png'), ...])
+    """
+
+    def __init__(self, size=CARD_SIZE, executable=None, flags=CHROME_FLAGS):
+        self.size = size
+        self.executable = executable
+        self.flags = list(flags)
+        self._proc = None
+        self._ws = None
+        self._session = None
+        self._profile = None
+        self._workdir = None
+        self._next_id = 0
+        self._events = []
+
+    # ---------- session lifecycle ----------
+
+    def start(self):
+        from html2image.browsers.search_utils import find_chrome
+        from websocket import create_connection
+
+        # Anything failing after this point must not leak Chrome or its temp directories.
+        try:
+            self._profile = tempfile.mkdtemp(prefix='gsn-chrome-')
+            self._workdir = tempfile.mkdtemp(prefix='gsn-cards-')
+            command = [
+                find_chrome(self.executable),
+                '--headless=new',
+                '--remote-debugging-port=0',
+                '--remote-allow-origins=*',
+                f'--user-data-dir={self._profile}',
+                f'--window-size={self.size[0]},{self.size[1]}',
+                '--no-first-run',
+                '--no-default-browser-check',
+                *self.flags,
+                'about:blank',
+            ]
+            self._proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+            # Chrome writes its chosen port and browser target path here once it is listening.
+            port_file = os.path.join(self._profile, 'DevToolsActivePort')
+            deadline = time.monotonic() + STARTUP_TIMEOUT
+            while not os.path.exists(port_file) or os.path.getsize(port_file) == 0:
+                if self._proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("Headless Chrome failed to start.")
+                time.sleep(0.05)
+            with open(port_file, 'r') as f:
+                port, browser_path = f.read().split('\n')[:2]
+
+            self._ws = create_connection(f"ws://127.0.0.1:{port}{browser_path}", timeout=RENDER_TIMEOUT)
+            target = self._call('Target.createTarget', url='about:blank')['targetId']
+            self._session = self._call('Target.attachToTarget', targetId=target, flatten=True)['sessionId']
+
+            self._call('Page.enable', session=True)
+            self._call('Emulation.setDeviceMetricsOverride', session=True,
+                       width=self.size[0], height=self.size[1], deviceScaleFactor=1, mobile=False)
+        except BaseException:
+            self.close()
+            raise
+        return self
+
+    def close(self):
+        if self._ws is not None:
+            try:
+                # Fire and forget: Chrome may drop the socket before replying.
+                self._ws.send(json.dumps({'id': self._next_id + 1, 'method': 'Browser.close'}))
+            except Exception:
+                pass
+            self._ws.close()
+            self._ws = None
+        elif self._proc is not None:
+            self._proc.terminate()
+        if self._proc is not None:
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+            self._proc = None
+        for path in (self._profile, self._workdir):
+            if path:
+                shutil.rmtree(path, ignore_errors=True)
+        self._profile = self._workdir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- DevTools protocol ----------
+
+    def _call(self, method, session=False, **params):
+        self._next_id += 1
+        message = {'id': self._next_id, 'method': method, 'params': params}
+        if session:
+            message['sessionId'] = self._session
+        self._ws.send(json.dumps(message))
+        while True:
+            reply = json.loads(self._ws.recv())
+            if reply.get('id') == message['id']:
+                if 'error' in reply:
+                    raise RuntimeError(f"{method}: {reply['error'].get('message')}")
+                return reply.get('result', {})
+            if 'method' in reply:
+                self._events.append(reply['method'])
+
+    def _wait_event(self, method):
+        while method not in self._events:
+            reply = json.loads(self._ws.recv())
+            if 'method' in reply:
+                self._events.append(reply['method'])
+        self._events.clear()
+
+    # ---------- rendering ----------
+
+    def render(self, html_str, output_file):
+        """Screenshot one HTML document to output_file (PNG)."""
+        page = os.path.join(self._workdir, 'card.html')
+        with open(page, 'w', encoding='utf-8') as f:
+            f.write(html_str)
+
+        self._events.clear()
+        self._call('Page.navigate', session=True, url='file://' + page)
+        self._wait_event('Page.loadEventFired')
+        # Web fonts can finish after the load event; wait for them explicitly.
+        self._call('Runtime.evaluate', session=True, expression='document.fonts.ready.then(() => true)',
+                   awaitPromise=True)
+        shot = self._call('Page.captureScreenshot', session=True, format='png')
+
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        with open(output_file, 'wb') as f:
+            f.write(base64.b64decode(shot['data']))
+        return output_file
+
+    def render_many(self, jobs):
+        """Render [(html_str, output_file), ...] in this session. Returns the output paths."""
+        return [self.render(html_str, output_file) for html_str, output_file in jobs]
+
+
+def render_many(jobs, size=CARD_SIZE):
+    """One-shot helper: start a browser, render every job, shut it down."""
+    with CardRenderer(size=size) as renderer:
+        return renderer.render_many(jobs)
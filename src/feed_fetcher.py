@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import atomic_write
+
+# GSN Terminal: Shared RSS Intercept Layer
+# Every feed request carries a connect/read timeout, batches run on a bounded
+# thread pool, and conditional batches persist ETag/Last-Modified validators so
+# unchanged feeds come back as 304 and are skipped without parsing.
+
+STATE_FILE = "data/feed_state.json"
+TIMEOUT = (5, 15)        # (connect, read) seconds
+MAX_WORKERS = 8
+HEADERS = {"User-Agent": "GSN-Terminal/1.0 (+https://taiwanstraittracker.com)"}
+
+_STATE_LOCK = threading.Lock()
+
+
+def _load_state():
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {}
+
+
+def _save_state(state):
+    atomic_write.write_json(STATE_FILE, state, indent=1, sort_keys=True)
+
+
+def _request(url, validators=None, timeout=TIMEOUT):
+    import feedparser
+    import requests
+
+    headers = dict(HEADERS)
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("modified"):
+            headers["If-Modified-Since"] = validators["modified"]
+
+    response = requests.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, validators
+    response.raise_for_status()
+
+    feed = feedparser.parse(response.content, response_headers=dict(response.headers))
+    fresh = {
+        "etag": response.headers.get("ETag"),
+        "modified": response.headers.get("Last-Modified"),
+    }
+    return feed, fresh
+
+
+def parse(url, timeout=TIMEOUT):
+    """Drop-in for feedparser.parse(url) with a hard network timeout.
+
+    Like feedparser, a fetch failure is not raised: it comes back as an empty
+    feed with `bozo` set and the error in `bozo_exception`.
+    """
+    import feedparser
+
+    try:
+        feed, _ = _request(url, timeout=timeout)
+    except Exception as e:
+        print(f"❌ Feed fetch failed - {url}: {e}")
+        return feedparser.FeedParserDict(entries=[], feed=feedparser.FeedParserDict(), bozo=1, bozo_exception=e)
+    return feed
+
+
+def fetch_feeds(feeds, conditional=True, timeout=TIMEOUT, max_workers=MAX_WORKERS):
+    """Fetch {name: url} concurrently.
+
+    Returns {name: parsed feed}, with None for feeds that were unchanged since
+    the last conditional fetch or that failed. Failures are logged, not raised.
+    """
+    with _STATE_LOCK:
+        state = _load_state() if conditional else {}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(_request, url, state.get(url), timeout) for name, url in feeds.items()}
+        for name, future in futures.items():
+            url = feeds[name]
+            try:
+                feed, validators = future.result()
+            except Exception as e:
+                print(f"❌ Target offline - {name}: {e}")
+                results[name] = None
+                continue
+            if feed is None:
+                print(f"⏭️ Not modified since last intercept: {name}")
+            elif validators and any(validators.values()):
+                state[url] = validators
+            results[name] = feed
+
+    if conditional:
+        with _STATE_LOCK:
+            merged = _load_state()
+            merged.update({url: state[url] for url in feeds.values() if url in state})
+            _save_state(merged)
+    return results
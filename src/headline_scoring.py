@@ -0,0 +1,48 @@
+import re
+
+# GSN Terminal: Headline Scoring Engine
+# Each node compiles its keyword list once into a single regex automaton and
+# scores a whole batch of headlines in one pass, returning a boolean hit
+# matrix (headlines x keywords) instead of looping keyword-by-keyword.
+
+
+class KeywordScorer:
+    """Substring keyword matcher over a batch of headlines.
+
+    Matches are case-insensitive substrings, the same semantics as the old
+    `word in title.lower()` loops. A zero-width lookahead finds a match at
+    every start position, and longest-first alternation plus a prefix table
+    recovers keywords that are prefixes of a longer match at the same spot.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        lowered = [k.lower() for k in self.keywords]
+        order = sorted(range(len(lowered)), key=lambda i: -len(lowered[i]))
+        self._pattern = re.compile(
+            "(?=(" + "|".join(re.escape(lowered[i]) for i in order) + "))"
+        )
+        self._columns = {}
+        for i, word in enumerate(lowered):
+            self._columns.setdefault(word, []).extend(
+                j for j, other in enumerate(lowered) if word.startswith(other)
+            )
+
+    def hits(self, headlines):
+        """Boolean matrix of shape (len(headlines), len(keywords))."""
+        import numpy as np
+
+        matrix = np.zeros((len(headlines), len(self.keywords)), dtype=bool)
+        for row, text in enumerate(headlines):
+            for match in self._pattern.finditer(text.lower()):
+                matrix[row, self._columns[match.group(1)]] = True
+        return matrix
+
+
+def sentiment(headlines):
+    """Polarity for every headline as one array, using a single shared analyser."""
+    import numpy as np
+    from textblob.en.sentiments import PatternAnalyzer
+
+    analyser = PatternAnalyzer()
+    return np.array([analyser.analyze(text).polarity for text in headlines], dtype=float)
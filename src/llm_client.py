@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from rate_limit import TokenBucket
+
+# GSN Terminal: Shared LLM Client
+# One way to call Gemini for the orchestrator, the broadcast matrix and the
+# migration script. Every call goes through the shared "gemini" token bucket
+# (so scripts in one workflow run share the quota), retries 429/5xx with
+# jittered exponential backoff, and is cached on a hash of model, config and
+# prompt, so an identical prompt within the TTL costs no call. Request,
+# latency and token counts are kept per client for the end-of-run report.
+# Set GSN_LLM_BACKEND=fake to run everything offline against FakeBackend.
+
+MODEL_ID = "gemini-3.5-flash"
+RATE_PER_MINUTE = 12      # free-tier Gemini budget
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 2.0        # seconds before the first retry, doubled each time
+BACKOFF_CAP = 60.0
+RETRYABLE_CODES = (408, 429, 500, 502, 503, 504)
+CACHE_DIR = ".cache/llm"
+CACHE_TTL = 24 * 3600
+
+
+class LLMError(Exception):
+    """The model could not be reached (or kept failing) after all retries."""
+
+
+class GeminiBackend:
+    def __init__(self, api_key):
+        from google import genai
+
+        self._client = genai.Client(api_key=api_key)
+
+    def generate(self, model, prompt, config):
+        """(text, prompt_tokens, response_tokens)"""
+        response = self._client.models.generate_content(model=model, contents=prompt, config=config)
+        usage = getattr(response, 'usage_metadata', None)
+        return (response.text or "",
+                getattr(usage, 'prompt_token_count', None) or 0,
+                getattr(usage, 'candidates_token_count', None) or 0)
+
+
+class FakeBackend:
+    """Offline stand-in: answers from `reply(prompt, config)`, or a canned line keyed on the prompt."""
+
+    def __init__(self, reply=None):
+        self.reply = reply
+        self.prompts = []
+
+    def generate(self, model, prompt, config):
+        self.prompts.append(prompt)
+        if self.reply:
+            text = self.reply(prompt, config)
+        else:
+            digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+            if (config or {}).get("response_mime_type") == "application/json":
+                text = json.dumps({"fake": True, "prompt": digest})
+            else:
+                text = f"[ID: 0] Fake response {digest}."
+        return text, len(prompt) // 4, len(text) // 4
+
+
+def _retryable(error):
+    code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    if isinstance(code, int):
+        return code in RETRYABLE_CODES
+    # No HTTP status: a dropped connection or timeout is worth another try.
+    # The genai SDK talks over httpx, whose transport errors (ConnectError,
+    # ReadTimeout, RemoteProtocolError...) do not subclass the builtin ones.
+    try:
+        import httpx
+    except ImportError:
+        transport_errors = ()
+    else:
+        transport_errors = (httpx.TransportError,)
+    return (isinstance(error, (ConnectionError, TimeoutError) + transport_errors)
+            or 'timeout' in type(error).__name__.lower())
+
+
+class LLMClient:
+    def __init__(self, api_key=None, model=MODEL_ID, backend=None, rate_per_minute=RATE_PER_MINUTE,
+                 cache_ttl=CACHE_TTL, cache_dir=CACHE_DIR):
+        if backend is None:
+            if os.environ.get("GSN_LLM_BACKEND") == "fake":
+                backend = FakeBackend()
+            elif api_key:
+                backend = GeminiBackend(api_key)
+        self.backend = backend
+        self.model = model
+        self.cache_ttl = cache_ttl
+        self.cache_dir = cache_dir
+        self.bucket = TokenBucket(rate_per_minute=rate_per_minute, capacity=1, name="gemini")
+        self._lock = threading.Lock()
+        self.metrics = {"requests": 0, "cache_hits": 0, "retries": 0, "failures": 0,
+                        "prompt_tokens": 0, "response_tokens": 0, "latency_ms": []}
+
+    @property
+    def available(self):
+        return self.backend is not None
+
+    def _cache_path(self, prompt, config):
+        key = json.dumps([self.model, config or {}, prompt], sort_keys=True)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + ".json")
+
+    def _cached(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - entry['created'] > self.cache_ttl:
+            return None
+        return entry['text']
+
+    def _store(self, path, text):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"created": time.time(), "text": text}, f)
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                if name == "latency_ms":
+                    self.metrics[name].append(value)
+                else:
+                    self.metrics[name] += value
+
+    def generate(self, prompt, config=None, cache=True):
+        """Model reply text for `prompt`. Raises LLMError once retries are spent."""
+        if not self.available:
+            raise LLMError("No LLM backend configured (GEMINI_API_KEY missing).")
+
+        path = self._cache_path(prompt, config) if cache and self.cache_ttl else None
+        if path:
+            text = self._cached(path)
+            if text is not None:
+                self._count(cache_hits=1)
+                return text
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            waited = self.bucket.acquire()
+            if waited >= 0.1:
+                print(f"GSN TERMINAL: Rate limiter held LLM call for {waited:.1f}s.")
+            started = time.perf_counter()
+            try:
+                text, prompt_tokens, response_tokens = self.backend.generate(self.model, prompt, config)
+            except Exception as e:
+                self._count(requests=1, latency_ms=round((time.perf_counter() - started) * 1000))
+                if attempt == MAX_ATTEMPTS or not _retryable(e):
+                    self._count(failures=1)
+                    raise LLMError(f"{e} (attempt {attempt} of {MAX_ATTEMPTS})") from e
+                delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                print(f"⚠️ LLM call failed ({e}). Retrying in {delay:.1f}s...")
+                self._count(retries=1)
+                time.sleep(delay)
+                continue
+            self._count(requests=1, latency_ms=round((time.perf_counter() - started) * 1000),
+                        prompt_tokens=prompt_tokens, response_tokens=response_tokens)
+            if path:
+                self._store(path, text)
+            return text
+
+    def report(self):
+        """One-line summary of this client's calls, for the end of a run."""
+        m = self.metrics
+        latencies = sorted(m['latency_ms'])
+        median = latencies[len(latencies) // 2] if latencies else 0
+        return (f"LLM: {m['requests']} requests, {m['cache_hits']} cache hits, {m['retries']} retries, "
+                f"{m['failures']} failures, median {median} ms, "
+                f"{m['prompt_tokens']} prompt / {m['response_tokens']} response tokens")
@@ -0,0 +1,67 @@
+import threading
+
+# GSN Terminal: Shared Market Data Layer
+# Nodes register the tickers they need at import time. The first node to ask
+# for a period triggers one bulk yf.download covering every ticker registered
+# for that period; later nodes read their columns from the cached frame.
+# pandas/yfinance are only imported on the first download, so registering
+# tickers at import time costs nothing.
+
+_REGISTRY = {}   # period -> set of tickers
+_FRAMES = {}     # period -> DataFrame with (field, ticker) columns
+_LOCK = threading.Lock()
+_DOWNLOAD_LOCK = threading.Lock()
+
+
+def register(tickers, period):
+    """Declare that a node will read these tickers for this period."""
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    with _LOCK:
+        _REGISTRY.setdefault(period, set()).update(tickers)
+
+
+def download(tickers, **kwargs):
+    """Bulk yf.download returning (field, ticker) columns.
+
+    yfinance keeps per-download state in module globals, so every download in
+    the process is serialised through this lock.
+    """
+    import pandas as pd
+    import yfinance as yf
+
+    tickers = sorted(set(tickers))
+    print(f"📡 Market data: {len(tickers)} tickers ({', '.join(tickers)})")
+    with _DOWNLOAD_LOCK:
+        frame = yf.download(tickers, group_by='column', auto_adjust=True,
+                            progress=False, threads=True, **kwargs)
+    if not isinstance(frame.columns, pd.MultiIndex):
+        frame.columns = pd.MultiIndex.from_product([frame.columns, tickers])
+    return frame
+
+
+def _frame(tickers, period):
+    with _LOCK:
+        frame = _FRAMES.get(period)
+        wanted = _REGISTRY.setdefault(period, set())
+        wanted.update(tickers)
+        have = set(frame.columns.get_level_values(1)) if frame is not None else set()
+        missing = wanted - have
+
+        if missing:
+            fetched = download(missing, period=period)
+            frame = fetched if frame is None else frame.join(fetched, how='outer')
+            _FRAMES[period] = frame
+    return frame
+
+
+def closes(tickers, period):
+    """Close prices for the tickers, dropping rows where none of them traded."""
+    frame = _frame(tickers, period)
+    return frame['Close'][list(tickers)].dropna(how='all')
+
+
+def history(ticker, period):
+    """OHLCV frame for one ticker, matching yf.Ticker(ticker).history(period)."""
+    frame = _frame([ticker], period)
+    return frame.xs(ticker, axis=1, level=1).dropna(how='all')
@@ -0,0 +1,173 @@
+"""
+Notification fan-out for the risk monitor — standard library only.
+
+Each configured sink (ntfy, a generic JSON webhook, a local file or stdout)
+gets the same message on its own thread, with bounded retries and
+exponential backoff, so one slow or flaky sink neither delays nor sinks the
+others. Urgent messages get more attempts than nominal digests.
+
+Sinks are configured from the environment:
+    NTFY_TOPIC          ntfy.sh topic (NTFY_SERVER overrides https://ntfy.sh/)
+    NOTIFY_WEBHOOK_URL  POSTs {"title", "message", "urgent"} as JSON
+    NOTIFY_FILE         appends each message to this path ("-" for stdout)
+
+For local testing, `python src/notifiers.py --serve 8099 --fail 2` runs a stub
+endpoint that answers 503 to the first two requests and prints the rest;
+point NTFY_SERVER or NOTIFY_WEBHOOK_URL at http://127.0.0.1:8099/.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+SEND_TIMEOUT = 15         # seconds per HTTP attempt
+ATTEMPTS = {True: 5, False: 2}   # urgent -> attempts per sink
+BACKOFF_BASE = 1.0        # seconds before the first retry, doubled each time
+BACKOFF_CAP = 20.0
+
+
+class PermanentError(Exception):
+    """A failure retrying cannot fix (bad request, auth, missing topic)."""
+
+
+def post_json(url, payload):
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=SEND_TIMEOUT) as r:
+            return r.status
+    except urllib.error.HTTPError as e:
+        # 408/429/5xx are worth another try; any other 4xx will fail the same way again.
+        if e.code < 500 and e.code not in (408, 429):
+            raise PermanentError(f"HTTP {e.code}") from e
+        raise
+
+
+class NtfySink:
+    def __init__(self, topic, server="https://ntfy.sh/"):
+        self.topic = topic
+        self.server = server
+        self.name = "ntfy"
+
+    def send(self, title, text, urgent):
+        # JSON API: UTF-8 titles/emoji go in the body, not HTTP headers
+        return post_json(self.server, {
+            "topic": self.topic,
+            "title": title,
+            "message": text,
+            "priority": 5 if urgent else 2,
+            "tags": ["rotating_light", "warning"] if urgent else ["green_circle"],
+        })
+
+
+class WebhookSink:
+    def __init__(self, url):
+        self.url = url
+        self.name = "webhook"
+
+    def send(self, title, text, urgent):
+        return post_json(self.url, {"title": title, "message": text, "urgent": urgent})
+
+
+class FileSink:
+    def __init__(self, path):
+        self.path = path
+        self.name = "stdout" if path == "-" else f"file:{path}"
+
+    def send(self, title, text, urgent):
+        stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        record = f"[{stamp}] {'URGENT ' if urgent else ''}{title}\n{text}\n\n"
+        if self.path == "-":
+            sys.stdout.write(record)
+        else:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(record)
+        return "ok"
+
+
+def sinks_from_env(env=None):
+    env = os.environ if env is None else env
+    sinks = []
+    if env.get("NTFY_TOPIC"):
+        sinks.append(NtfySink(env["NTFY_TOPIC"], env.get("NTFY_SERVER") or "https://ntfy.sh/"))
+    if env.get("NOTIFY_WEBHOOK_URL"):
+        sinks.append(WebhookSink(env["NOTIFY_WEBHOOK_URL"]))
+    if env.get("NOTIFY_FILE"):
+        sinks.append(FileSink(env["NOTIFY_FILE"]))
+    return sinks
+
+
+def send_with_retry(sink, title, text, urgent, attempts):
+    """(ok, detail) after at most `attempts` tries, backing off exponentially."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return True, f"{sink.send(title, text, urgent)} (attempt {attempt})"
+        except PermanentError as e:
+            return False, f"{e} (not retried)"
+        except Exception as e:
+            if attempt == attempts:
+                return False, f"{e} (gave up after {attempts} attempts)"
+            delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+
+def deliver(sinks, title, text, urgent):
+    """Send to every sink concurrently. Returns {sink name: (ok, detail)}."""
+    attempts = ATTEMPTS[bool(urgent)]
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(sinks))) as pool:
+        futures = {pool.submit(send_with_retry, s, title, text, urgent, attempts): s for s in sinks}
+        for fut in as_completed(futures):
+            sink = futures[fut]
+            results[sink.name] = fut.result()
+            ok, detail = results[sink.name]
+            print(f"{sink.name}: {'sent' if ok else 'FAILED'} {detail}")
+    return results
+
+
+def serve_stub(port, fail):
+    """Dev helper: a local endpoint that fails the first `fail` requests with 503."""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    state = {"seen": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            state["seen"] += 1
+            status = 503 if state["seen"] <= fail else 200
+            print(f"#{state['seen']} {self.path} -> {status}: {body.decode('utf-8', 'replace')}")
+            self.send_response(status)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"Stub notifier on http://127.0.0.1:{port}/ (failing the first {fail} requests)")
+    HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notifier dev helpers.")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Run the local stub endpoint.")
+    parser.add_argument("--fail", type=int, default=0, help="Answer 503 to this many requests first.")
+    parser.add_argument("--test", action="store_true", help="Send a test message to the configured sinks.")
+    args = parser.parse_args()
+    if args.serve:
+        serve_stub(args.serve, args.fail)
+    elif args.test:
+        sinks = sinks_from_env()
+        if not sinks:
+            sys.exit("No sinks configured (NTFY_TOPIC, NOTIFY_WEBHOOK_URL, NOTIFY_FILE).")
+        deliver(sinks, "Notifier test", "Test message from the Taiwan risk monitor.", urgent=False)
+    else:
+        parser.print_help()
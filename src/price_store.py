@@ -0,0 +1,143 @@
+import os
+import re
+import tempfile
+import numpy as np
+import pandas as pd
+import market_data
+
+# GSN Terminal: Local Price Store
+# One fixed-width binary file per ticker (data/prices/<TICKER>.bin), one
+# record per trading day, oldest first. A sync only downloads bars newer than
+# the stored history, so bandwidth scales with new data, not window length.
+
+STORE_DIR = "data/prices"
+RECORD = np.dtype([
+    ('date', '<i8'),     # days since 1970-01-01
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# A stored history that starts this long after the requested start is refetched.
+BACKFILL_SLACK_DAYS = 7
+
+
+def _path(ticker):
+    return os.path.join(STORE_DIR, re.sub(r'[^A-Za-z0-9]', '_', ticker) + '.bin')
+
+
+def _day(ts):
+    return int(np.datetime64(pd.Timestamp(ts).date(), 'D').astype('int64'))
+
+
+def load(ticker):
+    """Stored records for a ticker as a read-only memory map (empty if none)."""
+    path = _path(ticker)
+    if not os.path.exists(path) or os.path.getsize(path) < RECORD.itemsize:
+        return np.empty(0, dtype=RECORD)
+    return np.memmap(path, dtype=RECORD, mode='r')
+
+
+def _to_records(bars):
+    index = pd.DatetimeIndex(bars.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    records = np.empty(len(bars), dtype=RECORD)
+    records['date'] = index.values.astype('datetime64[D]').astype('int64')
+    for field in FIELDS:
+        records[field.lower()] = bars[field].to_numpy(dtype='f8')
+    return records
+
+
+def _write(ticker, records):
+    """Replace the ticker's file atomically, so a crash never leaves a torn store."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=STORE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            records.tofile(f)
+        os.replace(tmp_path, _path(ticker))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _bars(frame, ticker):
+    if frame.empty or ticker not in frame.columns.get_level_values(1):
+        return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([]))
+    bars = frame.xs(ticker, axis=1, level=1)
+    return bars.dropna(subset=['Close'])
+
+
+def sync(tickers, start):
+    """Bring every ticker's store up to date from `start` onwards.
+
+    The last stored bar is always replaced (it may have been an intraday
+    snapshot), and the bar before it is compared against the fresh download:
+    if Yahoo has re-adjusted history for a dividend or split, the ticker is
+    refetched in full instead of appended to.
+
+    A download that comes back empty (a Yahoo outage) or shorter than what is
+    stored never replaces the stored history.
+    """
+    start_day = _day(start)
+    full, incremental = [], {}
+    for ticker in tickers:
+        stored = load(ticker)
+        if len(stored) < 2 or stored['date'][0] > start_day + BACKFILL_SLACK_DAYS:
+            full.append(ticker)
+        else:
+            anchor = int(stored['date'][-2])
+            incremental.setdefault(anchor, []).append(ticker)
+
+    stale = []
+    for anchor, group in incremental.items():
+        fetch_from = str(np.datetime64(anchor, 'D'))
+        frame = market_data.download(group, start=fetch_from)
+        for ticker in group:
+            stored = load(ticker)
+            fresh = _to_records(_bars(frame, ticker))
+            if not len(fresh):
+                print(f"   ! {ticker}: no bars downloaded, keeping {len(stored)} stored")
+                continue
+            overlap = fresh[fresh['date'] == anchor]
+            if not len(overlap) or not np.isclose(overlap['close'][0], stored['close'][-2], rtol=1e-5):
+                stale.append(ticker)
+                continue
+            new = fresh[fresh['date'] > anchor]
+            if not len(new):
+                print(f"   ! {ticker}: no bars after {np.datetime64(anchor, 'D')}, keeping stored history")
+                continue
+            kept = np.array(stored[:-1])
+            del stored
+            _write(ticker, np.concatenate([kept, new]))
+            print(f"   + {ticker}: {len(new)} bar(s) refreshed")
+
+    full += stale
+    if full:
+        fetch_from = pd.Timestamp(start).strftime('%Y-%m-%d')
+        frame = market_data.download(full, start=fetch_from)
+        for ticker in full:
+            records = _to_records(_bars(frame, ticker))
+            stored_count = len(load(ticker))
+            if len(records) == 0 or len(records) < stored_count:
+                print(f"   ! {ticker}: full download returned {len(records)} bars, keeping {stored_count} stored")
+                continue
+            _write(ticker, records)
+            print(f"   + {ticker}: full history stored ({len(records)} bars)")
+
+
+def closes(tickers, start):
+    """Close prices from `start` onwards, one column per ticker."""
+    sync(tickers, start)
+    start_day = _day(start)
+    columns = {}
+    for ticker in tickers:
+        stored = load(ticker)
+        window = stored[stored['date'] >= start_day]
+        index = pd.DatetimeIndex(window['date'].astype('datetime64[D]'))
+        columns[ticker] = pd.Series(np.array(window['close']), index=index)
+    return pd.DataFrame(columns)
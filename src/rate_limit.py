@@ -0,0 +1,57 @@
+import json
+import os
+import threading
+import time
+
+# GSN Terminal: Token Bucket Rate Limiter
+# Replaces fixed pre-call sleeps in front of rate-limited APIs. A call only
+# waits when the bucket is empty, so the first call of a run goes straight
+# out. With a state file the bucket is shared by every script in a workflow
+# run (orchestrator, then broadcast matrix), which each run in their own process.
+
+STATE_DIR = ".cache/rate_limit"
+
+
+class TokenBucket:
+    """Allow `rate_per_minute` calls on average, with bursts up to `capacity`."""
+
+    def __init__(self, rate_per_minute, capacity=1, name=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.state_file = os.path.join(STATE_DIR, f"{name}.json") if name else None
+        self._lock = threading.Lock()
+        self._tokens, self._stamp = self._load()
+
+    def _load(self):
+        if self.state_file:
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                return float(state['tokens']), float(state['stamp'])
+            except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+                pass
+        return float(self.capacity), time.time()
+
+    def _save(self):
+        if self.state_file:
+            os.makedirs(STATE_DIR, exist_ok=True)
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({"tokens": self._tokens, "stamp": self._stamp}, f)
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self):
+        """Take one token, sleeping only as long as needed. Returns the seconds waited."""
+        with self._lock:
+            self._refill()
+            wait = 0.0
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                time.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+            self._save()
+            return wait
@@ -2,20 +2,29 @@
 Taiwan Strait Risk Monitor — standalone, no external dependencies.
 
 Fetches China-Taiwan conflict probabilities from Polymarket's public Gamma API,
-applies alert thresholds, and sends a daily brief via ntfy.sh push notification.
-Nominal days send at low priority (quiet); threshold breaches send as urgent.
+applies alert thresholds, and sends a daily brief via ntfy.sh push notification
+(plus any other sinks configured in notifiers.py). Nominal days send at low
+priority (quiet); threshold breaches send as urgent and are retried harder.
 
 Runs on GitHub Actions (see .github/workflows/risk_check.yml).
-Requires env var: NTFY_TOPIC (your secret ntfy.sh topic name).
+Requires env var: NTFY_TOPIC (your secret ntfy.sh topic name), or another
+sink from notifiers.py (NOTIFY_WEBHOOK_URL, NOTIFY_FILE).
 """
 
+import http.client
 import json
 import os
+import queue
+import sqlite3
 import sys
-import urllib.request
+import time
 import urllib.parse
+import threading
+from concurrent.futures import Future, wait
 from datetime import datetime, timezone
 
+import notifiers
+
 # ---------------- Config ----------------
 MARKETS = [
     {"slug": "china-x-taiwan-military-clash-before-2027", "label": "Clash before 2027"},
@@ -33,14 +42,74 @@ WEEK_MOVE = 0.05          # 1-week move >= +5 points
 # Alerts always send immediately, any day. Set to None for a daily brief.
 DIGEST_WEEKDAY = 5
 
-HISTORY_FILE = "data/risk_history.json"
+# Append-only price samples keyed by (slug, minute). Re-running within the
+# same minute replaces the sample, so the checker can run every few minutes
+# and each run costs one small insert, not a rewrite of the whole history.
+HISTORY_DB = "data/risk_history.db"
+LEGACY_HISTORY_FILE = "data/risk_history.json"
+SAMPLE_SECONDS = 60
+# d1/d7/d30 are measured against the newest sample taken within MOVE_SLACK of
+# exactly that long ago; without one (a missed run, a sampling gap), the API's
+# own change fields are used rather than a move spanning the wrong period.
+MOVE_WINDOWS = {"d1": 1, "d7": 7, "d30": 30}
+MOVE_SLACK = 3600
 GAMMA = "https://gamma-api.polymarket.com/events?slug={}"
 
+# Every Gamma request (all slugs plus the fallback query) runs at once, so a
+# dead market costs one REQUEST_TIMEOUT instead of one per request in turn.
+REQUEST_TIMEOUT = 10      # seconds per socket operation
+FETCH_DEADLINE = 15       # seconds for the whole fetch phase
+USER_AGENT = "taiwan-risk-monitor/1.0"
+
+
+class KeepAlivePool:
+    """Tiny stdlib HTTP(S) pool: persistent connections per host, safe across threads."""
+
+    def __init__(self, timeout=REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self._idle = {}
+
+    def _queue(self, origin):
+        return self._idle.setdefault(origin, queue.LifoQueue())
+
+    def get_json(self, url):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        idle = self._queue((parts.scheme, parts.netloc))
+        try:
+            conn, reused = idle.get_nowait(), True
+        except queue.Empty:
+            factory = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn, reused = factory(parts.netloc, timeout=self.timeout), False
+        try:
+            conn.request("GET", path, headers={"User-Agent": USER_AGENT, "Accept": "application/json"})
+            r = conn.getresponse()
+            body = r.read()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            conn.close()
+            if not reused:
+                raise
+            # Server dropped an idle keep-alive connection: retry once on a fresh one.
+            return self.get_json(url)
+        except Exception:
+            conn.close()
+            raise
+        idle.put(conn)
+        if r.status != 200:
+            raise RuntimeError(f"HTTP {r.status} for {url}")
+        return json.loads(body.decode("utf-8"))
+
+    def close(self):
+        for idle in self._idle.values():
+            while not idle.empty():
+                idle.get_nowait().close()
+
+
+HTTP = KeepAlivePool()
+
 
 def http_json(url):
-    req = urllib.request.Request(url, headers={"User-Agent": "taiwan-risk-monitor/1.0"})
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return json.loads(r.read().decode("utf-8"))
+    return HTTP.get_json(url)
 
 
 def open_market(event):
@@ -57,14 +126,15 @@ def fetch_market(slug, label):
         if events:
             m = open_market(events[0])
             if m:
-                return parse_market(m, label, substituted=False)
+                return parse_market(m, label, substituted=False, slug=slug)
     except Exception as e:
         print(f"WARN: {slug} fetch failed: {e}")
     return None
 
 
-def parse_market(m, label, substituted):
+def parse_market(m, label, substituted, slug):
     return {
+        "slug": slug,
         "label": label,
         "question": m.get("question", label),
         "yes": float(json.loads(m["outcomePrices"])[0]),
@@ -74,27 +144,69 @@ def parse_market(m, label, substituted):
         "vol24": m.get("volume24hr") or 0.0,
         "ends": m.get("endDateIso", "?"),
         "substituted": substituted,
+        "moves": "api",
     }
 
 
-def fetch_fallback(needed):
-    """If configured slugs are dead (markets roll over), find successors by keyword."""
-    out = []
+def fetch_fallback_events():
+    """Candidate events for fallback (fetched speculatively, alongside the slugs)."""
     try:
-        events = http_json(FALLBACK_URL)
-        for ev in events:
-            title = (ev.get("title") or "").lower()
-            if any(k in title for k in ("invade", "invasion", "clash", "attack", "blockade")):
-                m = open_market(ev)
-                if m:
-                    out.append(parse_market(m, ev.get("title", "Taiwan market"), substituted=True))
-            if len(out) >= needed:
-                break
+        return http_json(FALLBACK_URL)
     except Exception as e:
         print(f"WARN: fallback fetch failed: {e}")
+        return []
+
+
+def pick_fallback(events, needed):
+    """If configured slugs are dead (markets roll over), find successors by keyword."""
+    out = []
+    for ev in events:
+        title = (ev.get("title") or "").lower()
+        if any(k in title for k in ("invade", "invasion", "clash", "attack", "blockade")):
+            m = open_market(ev)
+            if m:
+                out.append(parse_market(m, ev.get("title", "Taiwan market"), substituted=True,
+                                        slug=m.get("slug") or ev.get("slug") or title))
+        if len(out) >= needed:
+            break
     return out
 
 
+def spawn(fn, *args):
+    """Run fn on a daemon thread, so a hung socket can never hold the process open at exit."""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def fetch_all(deadline=FETCH_DEADLINE):
+    """Fetch every configured market and the fallback query concurrently.
+
+    Returns markets in MARKETS order, topped up from the fallback results
+    when slugs are dead. Requests still running at the deadline count as
+    failed and are abandoned (their daemon threads die with the process).
+    """
+    start = time.monotonic()
+    market_futures = [spawn(fetch_market, x["slug"], x["label"]) for x in MARKETS]
+    fallback_future = spawn(fetch_fallback_events)
+    done, pending = wait(market_futures + [fallback_future], timeout=deadline)
+    if pending:
+        print(f"WARN: {len(pending)} request(s) missed the {deadline}s deadline")
+
+    markets = [f.result() for f in market_futures if f in done and f.result()]
+    if len(markets) < len(MARKETS) and fallback_future in done:
+        markets += pick_fallback(fallback_future.result(), len(MARKETS) - len(markets))
+    print(f"Fetched {len(markets)} market(s) in {time.monotonic() - start:.1f}s")
+    return markets
+
+
 def check_alerts(markets):
     alerts = []
     for m in markets:
@@ -132,65 +244,103 @@ def build_message(markets, alerts):
     return "\n".join(lines)
 
 
-def send_ntfy(title, text, urgent):
-    topic = os.environ.get("NTFY_TOPIC")
-    if not topic:
-        print("ERROR: NTFY_TOPIC not set")
+def notify(title, text, urgent):
+    """Fan out to every configured sink; exit non-zero if none delivered."""
+    sinks = notifiers.sinks_from_env()
+    if not sinks:
+        print("ERROR: no notification sink set (NTFY_TOPIC, NOTIFY_WEBHOOK_URL or NOTIFY_FILE)")
         sys.exit(1)
-    # JSON API: UTF-8 titles/emoji go in the body, not HTTP headers
-    payload = json.dumps({
-        "topic": topic,
-        "title": title,
-        "message": text,
-        "priority": 5 if urgent else 2,
-        "tags": ["rotating_light", "warning"] if urgent else ["green_circle"],
-    }).encode("utf-8")
-    req = urllib.request.Request(
-        "https://ntfy.sh/",
-        data=payload,
-        headers={"Content-Type": "application/json"})
-    with urllib.request.urlopen(req, timeout=30) as r:
-        print("ntfy:", r.status)
-
-
-def append_history(markets):
-    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
-    history = []
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, encoding="utf-8") as f:
-                history = json.load(f)
-        except Exception:
-            history = []
-    history.append({
-        "date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
-        **{m["label"]: round(m["yes"], 4) for m in markets},
-    })
-    history = history[-730:]  # keep ~2 years
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=1)
+    results = notifiers.deliver(sinks, title, text, urgent)
+    if not any(ok for ok, _ in results.values()):
+        print("ERROR: notification not delivered to any sink")
+        sys.exit(1)
+
+
+def open_history(path=HISTORY_DB):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    is_new = not os.path.exists(path)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS samples (
+            slug TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            yes REAL NOT NULL,
+            PRIMARY KEY (slug, ts)
+        ) WITHOUT ROWID""")
+    if is_new and os.path.exists(LEGACY_HISTORY_FILE):
+        import_legacy_history(conn)
+    return conn
+
+
+def import_legacy_history(conn):
+    """One-off import of the old daily JSON list (one row per run, by label)."""
+    slugs = {x["label"]: x["slug"] for x in MARKETS}
+    try:
+        with open(LEGACY_HISTORY_FILE, encoding="utf-8") as f:
+            history = json.load(f)
+    except Exception as e:
+        print(f"WARN: legacy history import skipped: {e}")
+        return
+    rows = []
+    for entry in history:
+        # Runs were scheduled at 22:00 UTC; same-day duplicates collapse to the last one.
+        day = datetime.strptime(entry["date"], "%Y-%m-%d").replace(hour=22, tzinfo=timezone.utc)
+        for label, yes in entry.items():
+            if label != "date":
+                rows.append((slugs.get(label, label), int(day.timestamp()), label, yes))
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?)", rows)
+    print(f"Imported {len(history)} legacy history rows")
+
+
+def record_samples(conn, markets, now):
+    ts = int(now.timestamp()) // SAMPLE_SECONDS * SAMPLE_SECONDS
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?)",
+                         [(m["slug"], ts, m["label"], round(m["yes"], 4)) for m in markets])
+
+
+def apply_local_moves(conn, markets, now):
+    """Replace the API's d1/d7/d30 with moves computed from stored samples."""
+    now_ts = int(now.timestamp())
+    for m in markets:
+        local = 0
+        for field, days in MOVE_WINDOWS.items():
+            target = now_ts - days * 86400
+            row = conn.execute(
+                "SELECT yes FROM samples WHERE slug = ? AND ts BETWEEN ? AND ? ORDER BY ts DESC LIMIT 1",
+                (m["slug"], target - MOVE_SLACK, target + MOVE_SLACK)).fetchone()
+            if row is not None:
+                m[field] = m["yes"] - row[0]
+                local += 1
+        m["moves"] = "local" if local == len(MOVE_WINDOWS) else "mixed" if local else "api"
+        if m["moves"] != "local":
+            print(f"{m['label']}: {m['moves']} moves (no stored sample for some windows)")
 
 
 def main():
-    markets = [m for m in (fetch_market(x["slug"], x["label"]) for x in MARKETS) if m]
-    if len(markets) < len(MARKETS):
-        markets += fetch_fallback(len(MARKETS) - len(markets))
+    markets = fetch_all()
     if not markets:
-        send_ntfy("Taiwan risk monitor FAILED",
+        notify("Taiwan risk monitor FAILED",
                   "No market data reachable. Check the workflow logs on GitHub.",
                   urgent=True)
         sys.exit(1)
 
+    now = datetime.now(timezone.utc)
+    conn = open_history()
+    apply_local_moves(conn, markets, now)
+    record_samples(conn, markets, now)
+    conn.close()
+
     alerts = check_alerts(markets)
     msg = build_message(markets, alerts)
-    now = datetime.now(timezone.utc)
     title = "🔴 TAIWAN RISK ALERT" if alerts else f"Taiwan risk nominal — {now.strftime('%d %b')}"
     print(title + "\n" + msg)
     if alerts or DIGEST_WEEKDAY is None or now.weekday() == DIGEST_WEEKDAY:
-        send_ntfy(title, msg, urgent=bool(alerts))
+        notify(title, msg, urgent=bool(alerts))
     else:
         print(f"Nominal, non-digest day (weekday {now.weekday()}): no notification sent.")
-    append_history(markets)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+from datetime import date, timedelta
+
+# GSN Terminal: Taiwan Risk History Store
+# Append-only daily series of final, market and conflict scores in SQLite.
+# The date is the primary key, so range queries are B-tree lookups and one
+# row per day is enforced by the schema. The page gets pre-aggregated windows
+# (daily for 30d/90d, weekly means for 1y, monthly means for all time) so
+# its payload stays small however long the history grows.
+
+HISTORY_DB = "data/taiwan_history.db"
+LEGACY_JSON = "data/history.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    date TEXT PRIMARY KEY,
+    final INTEGER NOT NULL,
+    market INTEGER,
+    conflict INTEGER
+) WITHOUT ROWID;
+"""
+
+# window name -> (bucket, size). Daily windows are the last `size` recorded
+# days (like the old 30-entry list); aggregated windows span `size` calendar
+# days ending today, or the whole history when size is None.
+WINDOWS = {
+    "30d": ("day", 30),
+    "90d": ("day", 90),
+    "1y": ("week", 365),
+    "all": ("month", None),
+}
+
+
+def open_history(path=HISTORY_DB):
+    """Open (and on first use create) the store, importing the legacy 30-day JSON list."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    is_new = not os.path.exists(path)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    if is_new and os.path.exists(LEGACY_JSON):
+        _import_legacy(conn)
+    return conn
+
+
+def _import_legacy(conn):
+    try:
+        with open(LEGACY_JSON, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    except Exception as e:
+        print(f"⚠️ Legacy history import skipped: {e}")
+        return
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO scores (date, final) VALUES (?, ?)",
+            [(entry['date'], entry['score']) for entry in history],
+        )
+    print(f"GSN TERMINAL: Imported {len(history)} history points from {LEGACY_JSON}.")
+
+
+def record(conn, day, final, market=None, conflict=None):
+    """Store the scores for `day` (YYYY-MM-DD), replacing an earlier run on the same day."""
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO scores (date, final, market, conflict) VALUES (?, ?, ?, ?)",
+            (day, final, market, conflict),
+        )
+
+
+def previous(conn, day):
+    """The latest entry strictly before `day`, or None."""
+    row = conn.execute("SELECT * FROM scores WHERE date < ? ORDER BY date DESC LIMIT 1", (day,)).fetchone()
+    return dict(row) if row else None
+
+
+def between(conn, start=None, end=None):
+    """Entries with start <= date <= end (inclusive, either bound optional), oldest first."""
+    rows = conn.execute(
+        "SELECT * FROM scores WHERE date >= ? AND date <= ? ORDER BY date",
+        (start or "0000-00-00", end or "9999-99-99"),
+    )
+    return [dict(row) for row in rows]
+
+
+def recent(conn, limit=30):
+    """The last `limit` recorded days, oldest first, as {"date", "score"} points."""
+    rows = conn.execute("SELECT date, final FROM scores ORDER BY date DESC LIMIT ?", (limit,)).fetchall()
+    return [{"date": row['date'], "score": row['final']} for row in reversed(rows)]
+
+
+def _bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _bucket_means(rows, bucket):
+    buckets = {}
+    for row in rows:
+        start = _bucket_start(date.fromisoformat(row['date']), bucket).isoformat()
+        buckets.setdefault(start, []).append(row['final'])
+    return [{"date": start, "score": round(sum(scores) / len(scores), 1)} for start, scores in sorted(buckets.items())]
+
+
+def windows(conn, today):
+    """Chart-ready series for every window in WINDOWS, ending at `today` (YYYY-MM-DD)."""
+    end = date.fromisoformat(today)
+    series = {}
+    for name, (bucket, size) in WINDOWS.items():
+        if bucket == "day":
+            series[name] = recent(conn, size)
+        else:
+            start = (end - timedelta(days=size - 1)).isoformat() if size else None
+            series[name] = _bucket_means(between(conn, start, today), bucket)
+    return series
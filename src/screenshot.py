@@ -1,16 +1,8 @@
-from html2image import Html2Image
+from card_renderer import CardRenderer
 import os
 
 def generate_card():
-    # 1. Initialize with "CI-Safe" flags
-    # --no-sandbox is REQUIRED for GitHub Actions (Ubuntu)
-    hti = Html2Image(
-        output_path='public',
-        size=(1200, 628),
-        custom_flags=['--no-sandbox', '--disable-gpu', '--hide-scrollbars']
-    )
-
-    # Ensure public directory exists
+    # 1. Ensure public directory exists
     os.makedirs('public', exist_ok=True)
 
     # 2. Define the CSS/HTML for the card
@@ -32,10 +24,11 @@ def generate_card():
     .footer { margin-top: 30px; font-size: 20px; color: #999; }
     """
 
-    # 3. Take the screenshot
+    # 3. Take the screenshot (the renderer runs Chrome with the CI-safe --no-sandbox flags)
     print("Generating screenshot...")
-    hti.screenshot(html_str=html_str, css_str=css_str, save_as='twitter_card.png')
+    with CardRenderer() as renderer:
+        renderer.render(f"<html><head><style>{css_str}</style></head><body>{html_str}</body></html>", 'public/twitter_card.png')
     print("Screenshot generated: public/twitter_card.png")
 
 if __name__ == "__main__":
-    generate_card()
\ No newline at end of file
+    generate_card()
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import time
+import atomic_write
+
+# GSN Terminal: Synthesis Cache
+# Remembers LLM briefings by a hash of the (rounded) telemetry that produced
+# them, so a run whose metrics match a recent run reuses that briefing instead
+# of calling the model. Entries expire after a TTL and the file is capped at
+# MAX_ENTRIES, evicting the least recently used. Reads only touch memory; the
+# file is rewritten on put(), and only when its content changed.
+
+CACHE_FILE = "data/synthesis_cache.json"
+TTL_SECONDS = 24 * 3600
+MAX_ENTRIES = 32
+PRECISION = 1
+
+
+def _rounded(value, precision):
+    if isinstance(value, float):
+        return round(value, precision)
+    if isinstance(value, dict):
+        return {k: _rounded(v, precision) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_rounded(v, precision) for v in value]
+    return value
+
+
+def metrics_key(metrics, precision=PRECISION):
+    """Stable hash of metrics with floats rounded, so noise below `precision` still hits."""
+    payload = json.dumps(_rounded(metrics, precision), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SynthesisCache:
+    def __init__(self, path=CACHE_FILE, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._entries = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry['created'] > self.ttl:
+            return None
+        entry['used'] = time.time()
+        return entry['value']
+
+    def put(self, key, value):
+        now = time.time()
+        self._entries[key] = {"created": now, "used": now, "value": value}
+        # Expired entries go first, then least recently used beyond the cap.
+        self._entries = {k: e for k, e in self._entries.items() if now - e['created'] <= self.ttl}
+        for stale in sorted(self._entries, key=lambda k: self._entries[k]['used'])[:-self.max_entries]:
+            del self._entries[stale]
+        self._save()
+
+    def _save(self):
+        atomic_write.write_json(self.path, self._entries, indent=1, sort_keys=True)
@@ -0,0 +1,118 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# GSN Terminal: Master Telemetry Store
+# Every node appends one typed record per day to a single SQLite table keyed
+# on (node, date), so a same-day rerun replaces its row instead of piling up
+# duplicates. Consumers pull the latest reading of every node, or any node's
+# history, with one indexed query instead of opening each node's JSON export.
+
+TELEMETRY_DB = "data/telemetry.db"
+LEGACY_CSV = "data/master_telemetry.csv"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS telemetry (
+    node TEXT NOT NULL,
+    date TEXT NOT NULL,
+    risk_score REAL,
+    status TEXT,
+    metrics TEXT NOT NULL DEFAULT '{}',
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (node, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_telemetry_date ON telemetry (date, node);
+"""
+
+_LOCK = threading.Lock()
+
+
+def open_store(path=TELEMETRY_DB):
+    """Open (and on first use create) the store, importing the legacy CSV."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    is_new = not os.path.exists(path)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    if is_new and os.path.exists(LEGACY_CSV):
+        _import_legacy(conn)
+    return conn
+
+
+def _import_legacy(conn):
+    try:
+        with open(LEGACY_CSV, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+    except Exception as e:
+        print(f"⚠️ Legacy telemetry import skipped: {e}")
+        return
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO telemetry (node, date, risk_score, status, recorded_at) VALUES (?, ?, ?, ?, ?)",
+            [(row['Node'].lower(), row['Date'], float(row['Risk_Score']), row['Status'], row['Date']) for row in rows],
+        )
+    print(f"GSN TERMINAL: Imported {len(rows)} telemetry rows from {LEGACY_CSV}.")
+
+
+def _today():
+    import pytz
+
+    return datetime.now(pytz.timezone('Australia/Brisbane')).strftime('%Y-%m-%d')
+
+
+def _plain(value):
+    # numpy scalars from the market nodes
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def _row(row):
+    record = dict(row)
+    record['metrics'] = json.loads(record['metrics'])
+    return record
+
+
+def record(node, metrics, risk_score=None, status=None, day=None):
+    """Store today's (or `day`'s) reading for `node`, replacing a same-day rerun."""
+    with _LOCK:
+        conn = open_store()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO telemetry (node, date, risk_score, status, metrics, recorded_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (node, day or _today(), None if risk_score is None else float(risk_score), status,
+                     json.dumps(metrics, sort_keys=True, default=_plain), datetime.now().isoformat(timespec='seconds')),
+                )
+        finally:
+            conn.close()
+
+
+def latest(nodes=None):
+    """{node: record} with the most recent reading of every node (or just `nodes`)."""
+    conn = open_store()
+    try:
+        rows = conn.execute(
+            "SELECT t.* FROM telemetry t "
+            "JOIN (SELECT node, MAX(date) AS date FROM telemetry GROUP BY node) m "
+            "ON t.node = m.node AND t.date = m.date"
+        ).fetchall()
+    finally:
+        conn.close()
+    records = {row['node']: _row(row) for row in rows}
+    return {n: r for n, r in records.items() if nodes is None or n in nodes}
+
+
+def series(node, start=None, end=None):
+    """All readings of `node` with start <= date <= end, oldest first."""
+    conn = open_store()
+    try:
+        rows = conn.execute(
+            "SELECT * FROM telemetry WHERE node = ? AND date >= ? AND date <= ? ORDER BY date",
+            (node, start or "0000-00-00", end or "9999-99-99"),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [_row(row) for row in rows]
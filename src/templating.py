@@ -0,0 +1,46 @@
+import os
+import threading
+import atomic_write
+
+# GSN Terminal: Shared Page Templating
+# One jinja2 Environment for every page builder. Templates are loaded through
+# a FileSystemLoader and compiled once per process; the compiled bytecode is
+# also cached on disk, so later runs skip the parse/compile step entirely.
+
+TEMPLATE_DIR = "templates"
+BYTECODE_CACHE_DIR = ".cache/jinja2"
+
+_ENV = None
+_ENV_LOCK = threading.Lock()
+
+
+def environment():
+    """The process-wide Environment, created on first use (thread-safe for the pipeline)."""
+    global _ENV
+    if _ENV is None:
+        with _ENV_LOCK:
+            if _ENV is None:
+                from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+                os.makedirs(BYTECODE_CACHE_DIR, exist_ok=True)
+                _ENV = Environment(
+                    loader=FileSystemLoader(TEMPLATE_DIR),
+                    bytecode_cache=FileSystemBytecodeCache(BYTECODE_CACHE_DIR),
+                )
+    return _ENV
+
+
+def render(template_name, **context):
+    return environment().get_template(template_name).render(**context)
+
+
+def render_page(template_name, output_file, volatile=('last_updated',), **context):
+    """Render to output_file, skipping the write when only `volatile` context changed.
+
+    Returns True if the file was written.
+    """
+    html = render(template_name, **context)
+    stable = None
+    if any(key in context for key in volatile):
+        stable = render(template_name, **{**context, **{key: "" for key in volatile if key in context}})
+    return atomic_write.write_text(output_file, html, stable)
@@ -0,0 +1,80 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+# GSN Terminal: Whisper Ledger
+# SQLite-backed memory bank for KOL context nodes. A unique (author, title)
+# index makes de-duplication a single insert, and a status index lets the
+# broadcast matrix pull the unpublished backlog without scanning history.
+
+LEDGER_DB = "data/whisper_ledger.db"
+LEGACY_JSON = "data/whisper_ledger.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS whispers (
+    id INTEGER PRIMARY KEY,
+    author TEXT NOT NULL,
+    title TEXT NOT NULL,
+    snippet TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'UNPUBLISHED',
+    date_added TEXT NOT NULL,
+    UNIQUE (author, title)
+);
+CREATE INDEX IF NOT EXISTS idx_whispers_status ON whispers (status, id);
+"""
+
+
+def open_ledger(path=LEDGER_DB):
+    """Open (and on first use create) the ledger, importing the legacy JSON file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    is_new = not os.path.exists(path)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    if is_new and os.path.exists(LEGACY_JSON):
+        _import_legacy(conn)
+    return conn
+
+
+def _import_legacy(conn):
+    try:
+        with open(LEGACY_JSON, 'r', encoding='utf-8') as f:
+            whispers = json.load(f).get('whispers', [])
+    except Exception as e:
+        print(f"⚠️ Legacy ledger import skipped: {e}")
+        return
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO whispers (author, title, snippet, status, date_added) VALUES (?, ?, ?, ?, ?)",
+            [(w['author'], w['title'], w.get('snippet', ''), w.get('status', 'UNPUBLISHED'),
+              w.get('date_added', '')) for w in whispers],
+        )
+    print(f"GSN TERMINAL: Imported {len(whispers)} whispers from {LEGACY_JSON}.")
+
+
+def add_if_new(conn, author, title, snippet):
+    """Insert a whisper unless (author, title) is already logged. Returns True if added."""
+    with conn:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO whispers (author, title, snippet, date_added) VALUES (?, ?, ?, ?)",
+            (author, title, snippet, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+    return cursor.rowcount == 1
+
+
+def unpublished(conn):
+    """Unpublished whispers, oldest first, as plain dicts."""
+    rows = conn.execute("SELECT * FROM whispers WHERE status = 'UNPUBLISHED' ORDER BY id")
+    return [dict(row) for row in rows]
+
+
+def mark_published(conn, whisper_id):
+    with conn:
+        conn.execute("UPDATE whispers SET status = 'PUBLISHED' WHERE id = ?", (whisper_id,))
+
+
+def recently_published(conn, limit):
+    """The `limit` most recently published whispers, newest first, as plain dicts."""
+    rows = conn.execute("SELECT * FROM whispers WHERE status = 'PUBLISHED' ORDER BY id DESC LIMIT ?", (limit,))
+    return [dict(row) for row in rows]
@@ -0,0 +1,125 @@
+import math
+import re
+from collections import Counter
+from datetime import datetime
+
+# GSN Terminal: Whisper Pre-Ranking
+# Scores the unpublished backlog locally and hands the broadcast prompt only a
+# short list that fits a fixed token budget, so the Gemini call costs the same
+# whether the ledger holds ten whispers or a thousand. Each whisper is scored on
+# recency, overlap with today's active alerts, and TF-IDF novelty against what
+# was already published; picks are then spread across authors. Standard
+# library only: the broadcast job does not install numpy.
+
+TOP_K = 8
+TOKEN_BUDGET = 1500            # prompt tokens for the whole context-node block
+CHARS_PER_TOKEN = 4            # rough English average, good enough for a budget
+RECENCY_HALF_LIFE_DAYS = 7
+NOVELTY_CORPUS = 200           # most recent published whispers compared against
+AUTHOR_PENALTY = 0.5           # score multiplier per pick already taken from an author
+POOL_FACTOR = 8                # diversity re-ranking looks at the best k * POOL_FACTOR only
+WEIGHTS = {"recency": 0.35, "relevance": 0.35, "novelty": 0.30}
+
+STOPWORDS = frozenset("""
+the and for that with this from are was were has have had not but you your our their its they them
+will would can could should into about over after before more most than then also just been being
+what when where which while who whom why how all any some such only other very there here out
+""".split())
+
+_WORD = re.compile(r"[a-z][a-z0-9'-]{2,}")
+
+
+def tokens(text):
+    return [w for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS]
+
+
+def entry_text(idx, whisper):
+    """The prompt block for one whisper (the budget is measured on exactly this)."""
+    return f"ID: {idx}\nKOL: {whisper['author']}\nContext: {whisper['snippet']}\n\n"
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _recency(whisper, now):
+    try:
+        added = datetime.strptime(whisper.get('date_added', ''), "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return 0.5
+    age_days = max(0.0, (now - added).total_seconds() / 86400)
+    return 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+
+def _tfidf(docs):
+    """Unit-length TF-IDF vectors ({term: weight}) for token lists."""
+    df = Counter(term for doc in docs for term in set(doc))
+    n = len(docs)
+    vectors = []
+    for doc in docs:
+        counts = Counter(doc)
+        vec = {t: (c / len(doc)) * (math.log((1 + n) / (1 + df[t])) + 1) for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        vectors.append({t: v / norm for t, v in vec.items()})
+    return vectors
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(t, 0.0) for t, v in a.items())
+
+
+def _score(unpublished, published, alerts, now):
+    candidate_docs = [tokens(f"{w['title']} {w['snippet']}") for w in unpublished]
+    published_docs = [tokens(f"{w['title']} {w['snippet']}") for w in published]
+    vectors = _tfidf(candidate_docs + published_docs)
+    candidate_vecs, published_vecs = vectors[:len(candidate_docs)], vectors[len(candidate_docs):]
+
+    alert_terms = set(tokens(" ".join(f"{a.get('type', '')} {a.get('headline', '')}" for a in alerts)))
+
+    scored = []
+    for whisper, doc, vec in zip(unpublished, candidate_docs, candidate_vecs):
+        parts = {
+            "recency": _recency(whisper, now),
+            "relevance": len(alert_terms & set(doc)) / len(alert_terms) if alert_terms else 0.0,
+            "novelty": 1.0 - max((_cosine(vec, p) for p in published_vecs), default=0.0),
+        }
+        total = sum(WEIGHTS[name] * value for name, value in parts.items())
+        scored.append((dict(whisper, score=round(total, 4), score_parts=parts), vec))
+    scored.sort(key=lambda pair: (-pair[0]['score'], pair[0]['id']))
+    return scored
+
+
+def score(unpublished, published=(), alerts=(), now=None):
+    """Whispers as dicts with a `score` and its parts, best first (before diversity)."""
+    return [whisper for whisper, _ in _score(unpublished, published, alerts, now or datetime.now())]
+
+
+def shortlist(unpublished, published=(), alerts=(), k=TOP_K, token_budget=TOKEN_BUDGET, now=None):
+    """The top `k` whispers that fit in `token_budget`, spread across authors and topics.
+
+    Each pick discounts the rest by author (AUTHOR_PENALTY per earlier pick
+    from the same author) and by similarity to what is already picked.
+    Always returns at least one whisper when the backlog is not empty.
+    """
+    remaining = _score(unpublished, published, alerts, now or datetime.now())[:k * POOL_FACTOR]
+    picked, picked_vecs, per_author, used = [], [], Counter(), 0
+
+    def adjusted(pair):
+        whisper, vec = pair
+        overlap = max((_cosine(vec, p) for p in picked_vecs), default=0.0)
+        return whisper['score'] * AUTHOR_PENALTY ** per_author[whisper['author']] * (1.0 - overlap)
+
+    while remaining and len(picked) < k:
+        best = max(remaining, key=adjusted)
+        remaining.remove(best)
+        whisper, vec = best
+        cost = estimate_tokens(entry_text(len(picked), whisper))
+        if picked and used + cost > token_budget:
+            break
+        picked.append(whisper)
+        picked_vecs.append(vec)
+        per_author[whisper['author']] += 1
+        used += cost
+    return picked